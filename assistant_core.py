@@ -4,10 +4,139 @@ Coordinates all modules and handles request routing
 """
 
 import logging
-import asyncio
-from typing import Dict, Optional
+import sys
+import concurrent.futures
+from typing import Dict, Optional, Iterator
 import re
 import json
+import time
+import functools
+import threading
+import queue
+
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    # Optional speed-up only; the regex matcher below is used instead
+    AHOCORASICK_AVAILABLE = False
+
+
+# Intent trigger phrases in priority order (earlier intents win)
+_INTENT_KEYWORDS = [
+    ('web_search', [
+        'search for', 'search about', 'search up',
+        'look up', 'look for',
+        'find information about', 'find information on',
+        'find info about', 'find info on',
+        'find out about', 'find out on',
+        'what is', 'who is', 'where is', 'how to'
+    ]),
+    ('system_control', [
+        'open application', 'open app', 'open program',
+        'launch',
+        'start application', 'start app', 'start program',
+        'run application', 'run app', 'run program',
+        'open notepad', 'open calculator', 'open explorer', 'open chrome', 'open firefox'
+    ]),
+    ('file_operation', [
+        'read the file', 'read file',
+        'write to file', 'write file',
+        'create a file', 'create file',
+        'list files', 'list directory',
+        'show files', 'show directory'
+    ]),
+    ('system_info', [
+        'system info', 'system information',
+        'cpu usage', 'memory usage', 'disk space',
+        'what are my system specs'
+    ])
+]
+
+# Regex fallback, specialized into a single pattern at import time. Each
+# intent is a lookahead alternative tried in priority order, so one C-level
+# match both finds the highest-priority intent and names it via lastgroup.
+_INTENT_RE = re.compile("|".join(
+    f"(?=.*?(?:{'|'.join(re.escape(k) for k in keywords)}))(?P<{intent}>)"
+    for intent, keywords in _INTENT_KEYWORDS
+), re.DOTALL)
+
+# Intents whose responses may be served from the response cache
+_CACHEABLE_INTENTS = ('conversation', 'web_search')
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _build_intent_automaton():
+    """
+    Build an Aho-Corasick automaton over all intent trigger phrases
+    
+    Returns:
+        Automaton mapping each phrase to (priority, intent), or None if
+        pyahocorasick is not installed
+    """
+    if not AHOCORASICK_AVAILABLE:
+        return None
+    
+    automaton = ahocorasick.Automaton()
+    for priority, (intent, keywords) in enumerate(_INTENT_KEYWORDS):
+        for keyword in keywords:
+            automaton.add_word(keyword, (priority, intent))
+    automaton.make_automaton()
+    return automaton
+
+
+_INTENT_AC = _build_intent_automaton()
+
+
+@functools.lru_cache(maxsize=2048)
+def _detect_intent_cached(text_lower: str) -> str:
+    """
+    Detect intent from lowercased, whitespace-normalized text
+    
+    Pure function of its input, so results are memoized.
+    
+    Args:
+        text_lower: Normalized user input
+        
+    Returns:
+        str: Detected intent
+    """
+    if _INTENT_AC is not None:
+        # Single pass over the text; keep the highest-priority match
+        best = None
+        for _, (priority, intent) in _INTENT_AC.iter(text_lower):
+            if best is None or priority < best[0]:
+                best = (priority, intent)
+                if priority == 0:
+                    break
+        return best[1] if best else 'conversation'
+    
+    m = _INTENT_RE.match(text_lower)
+    return m.lastgroup if m else 'conversation'
+
+
+# Strips list markers such as "1." or "-" from predicted follow-ups
+_LIST_MARKER_RE = re.compile(r'^\s*(?:\d+[.)]|[-*\u2022])\s*')
+
+# System info queries that ask for a single stat and need no LLM phrasing
+_BARE_STAT_RE = re.compile(r'^(?:(?:show|check|get) )?(?:my |the )?(cpu usage|memory usage|disk space)\s*\??$')
+
+# Phrases stripped from the front of web search queries
+_SEARCH_PREFIXES = ('search for', 'search about', 'look up', 'find information about')
+
+# Windows drive path or POSIX absolute path
+_PATH_RE = re.compile(r'[A-Za-z]:\\[^\s]+|/[^\s]+')
+
+# Printed once when voice mode starts
+_VOICE_BANNER = (
+    "\n" + "="*60 + "\n"
+    "  Voice Mode Activated\n"
+    + "="*60 + "\n"
+    "\nListening for your voice commands...\n"
+    "Press Ctrl+C to exit voice mode\n\n"
+)
 
 
 class AssistantCore:
@@ -16,6 +145,13 @@ class AssistantCore:
     Handles request routing, intent detection, and response generation
     """
     
+    # Static instructions kept ahead of dynamic content so the LLM can
+    # reuse the evaluated prompt prefix across calls
+    _WEB_SYSTEM_PREFIX = "You answer the user's question using the provided search results."
+    _SYSINFO_SYSTEM_PREFIX = "You answer the user's question using the provided system information."
+    _FOLLOWUP_SYSTEM_PREFIX = ("You predict the questions a user is likely to ask next. "
+                               "Reply with one question per line and nothing else.")
+    
     def __init__(self, config: Dict):
         """
         Initialize assistant core with configuration
@@ -30,9 +166,28 @@ class AssistantCore:
         self.web = None
         self.system = None
         self.chat = None
+        self.response_cache = None
+        
+        # Short-lived snapshot of system info as (timestamp, info)
+        self._sysinfo_cache = (0.0, None)
+        
+        # Speculative follow-up prefetching. Every user message bumps the
+        # turn counter, so speculation for an earlier turn can tell it has
+        # been overtaken without a flag that could be reset too late
+        self._prefetch_queue = queue.Queue()
+        self._prefetch_thread = None
+        self._turn = 0
+        # Answers to predicted follow-ups as (turn, {question key: answer})
+        self._prefetched = (-1, {})
         
         self.logger = logging.getLogger(__name__)
         self.initialized = False
+        self._shut_down = False
+        
+        # Lowercased allow-list, computed once instead of per request
+        allowed = self.config.get('system', {}).get('allowed_commands', [])
+        self._allowed_apps_lower = [(app.lower(), app) for app in allowed]
+        self._allowed_ac = self._build_app_automaton()
     
     def initialize_all(self) -> bool:
         """
@@ -44,44 +199,80 @@ class AssistantCore:
         try:
             from llama_model import LlamaModel
             from tts_engine import TextToSpeech
-            from stt_engine import SpeechToText
             from web_tools import WebTools
             from system_control import SystemControl
             from chat_interface import ChatInterface
+            from response_cache import ResponseCache
             
             self.logger.info("Initializing assistant modules...")
             
-            # Initialize LLM
-            self.logger.info("Loading LLM model...")
-            self.llm = LlamaModel(self.config['llm'])
-            if not self.llm.load_model():
+            def load_llm():
+                self.logger.info("Loading LLM model...")
+                llm = LlamaModel(self.config['llm'])
+                return llm, llm.load_model()
+            
+            def init_tts():
+                self.logger.info("Initializing TTS engine...")
+                tts = TextToSpeech(self.config['tts'])
+                return tts, tts.initialize()
+            
+            def init_stt():
+                # Only voice mode listens; skip importing the speech stack otherwise
+                if self.config['assistant'].get('mode', 'text') != 'voice':
+                    return None, True
+                
+                from stt_engine import SpeechToText
+                self.logger.info("Initializing STT engine...")
+                stt = SpeechToText(self.config['stt'])
+                return stt, stt.initialize()
+            
+            def init_web():
+                self.logger.info("Initializing web tools...")
+                return WebTools(self.config['web'])
+            
+            def init_system():
+                self.logger.info("Initializing system control...")
+                return SystemControl(self.config['system'])
+            
+            # Modules are independent of each other, so load them concurrently
+            with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
+                f_llm = executor.submit(load_llm)
+                f_tts = executor.submit(init_tts)
+                f_stt = executor.submit(init_stt)
+                f_web = executor.submit(init_web)
+                f_sys = executor.submit(init_system)
+                concurrent.futures.wait([f_llm, f_tts, f_stt, f_web, f_sys])
+            
+            self.llm, llm_ok = f_llm.result()
+            self.tts, tts_ok = f_tts.result()
+            self.stt, stt_ok = f_stt.result()
+            self.web = f_web.result()
+            self.system = f_sys.result()
+            
+            if not llm_ok:
                 self.logger.error("Failed to load LLM model")
                 return False
             
-            # Initialize TTS
-            self.logger.info("Initializing TTS engine...")
-            self.tts = TextToSpeech(self.config['tts'])
-            if not self.tts.initialize():
+            if not tts_ok:
                 self.logger.warning("TTS initialization failed, continuing without TTS")
             
-            # Initialize STT
-            self.logger.info("Initializing STT engine...")
-            self.stt = SpeechToText(self.config['stt'])
-            if not self.stt.initialize():
+            if not stt_ok:
                 self.logger.warning("STT initialization failed, continuing without STT")
             
-            # Initialize Web Tools
-            self.logger.info("Initializing web tools...")
-            self.web = WebTools(self.config['web'])
-            
-            # Initialize System Control
-            self.logger.info("Initializing system control...")
-            self.system = SystemControl(self.config['system'])
+            # Initialize Response Cache
+            self.response_cache = ResponseCache(self.config.get('cache', {}))
             
             # Initialize Chat Interface
             self.logger.info("Initializing chat interface...")
             self.chat = ChatInterface(self.config['assistant'])
-            self.chat.set_message_callback(self.process_message)
+            self.chat.set_message_callback(self.process_message_stream)
+            self.chat.set_stats_callback(self.get_cache_stats)
+            self.chat.set_clear_callback(self.clear_conversation)
+            
+            # Start follow-up prefetching
+            if self.config['assistant'].get('prefetch_followups', False):
+                self._prefetch_thread = threading.Thread(target=self._prefetch_worker, daemon=True)
+                self._prefetch_thread.start()
             
             self.initialized = True
             self.logger.info("All modules initialized successfully!")
@@ -101,29 +292,119 @@ class AssistantCore:
         Returns:
             str: Assistant response
         """
+        return "".join(self.process_message_stream(user_input))
+    
+    def process_message_stream(self, user_input: str) -> Iterator[str]:
+        """
+        Process user message and stream the response as it is generated
+        
+        Args:
+            user_input: User input text
+            
+        Yields:
+            str: Chunks of the assistant response
+        """
         if not self.initialized:
-            return "Error: Assistant not initialized"
+            yield "Error: Assistant not initialized"
+            return
+        
+        # Real user input takes priority over speculative generation
+        prior_turn = self._turn
+        self._turn += 1
         
         try:
             # Detect intent
             intent = self._detect_intent(user_input)
             
+            # Answers prefetched for the previous turn were generated with
+            # the current history, so they are only valid right now
+            if intent == 'conversation':
+                turn, answers = self._prefetched
+                answer = answers.get(self._question_key(user_input)) if turn == prior_turn else None
+                if answer is not None:
+                    self.logger.info(f"Serving prefetched answer: {user_input}")
+                    self.llm.add_exchange(user_input, answer)
+                    yield answer
+                    return
+            
+            # Serve repeated questions from the response cache. The cache
+            # is keyed on the utterance alone, so conversation replies are
+            # only cached while there are no earlier turns they could
+            # depend on; web answers are generated without history
+            cacheable = self.response_cache is not None and intent in _CACHEABLE_INTENTS
+            if intent == 'conversation' and self.llm.conversation_history:
+                cacheable = False
+            if cacheable:
+                cached = self.response_cache.get(user_input)
+                if cached is not None:
+                    self.logger.info(f"Response cache hit: {user_input}")
+                    if intent == 'conversation':
+                        # Keep the model's history in step with what was shown
+                        self.llm.add_exchange(user_input, cached)
+                    yield cached
+                    return
+            
             # Route to appropriate handler
             if intent == 'web_search':
-                return self._handle_web_search(user_input)
+                chunks = self._handle_web_search(user_input)
             elif intent == 'system_control':
-                return self._handle_system_control(user_input)
+                chunks = [self._handle_system_control(user_input)]
             elif intent == 'file_operation':
-                return self._handle_file_operation(user_input)
+                chunks = [self._handle_file_operation(user_input)]
             elif intent == 'system_info':
-                return self._handle_system_info(user_input)
+                chunks = self._handle_system_info(user_input)
             else:
                 # Default: Generate LLM response
-                return self._handle_conversation(user_input)
+                chunks = self._handle_conversation(user_input)
+            
+            parts = []
+            for chunk in chunks:
+                parts.append(chunk)
+                yield chunk
+            
+            response = "".join(parts)
+            if not response.startswith("Error"):
+                if cacheable:
+                    self.response_cache.put(user_input, response)
+                
+                if self._prefetch_thread and intent == 'conversation':
+                    self._prefetch_queue.put((self._turn, user_input, response))
                 
         except Exception as e:
             self.logger.error(f"Error processing message: {e}")
-            return f"I encountered an error: {str(e)}"
+            yield f"I encountered an error: {str(e)}"
+    
+    def get_cache_stats(self) -> Dict:
+        """
+        Get statistics for the assistant's internal caches
+        
+        Returns:
+            Dictionary with intent and response cache statistics
+        """
+        info = _detect_intent_cached.cache_info()
+        stats = {
+            'intent_cache_hits': info.hits,
+            'intent_cache_misses': info.misses,
+            'intent_cache_size': f"{info.currsize}/{info.maxsize}"
+        }
+        
+        if self.response_cache is not None:
+            stats.update(self.response_cache.get_stats())
+        
+        return stats
+    
+    def clear_conversation(self):
+        """Forget the conversation and any responses cached from it"""
+        # Also stops speculation on, and prefetched answers for, the old context
+        self._turn += 1
+        self.llm.reset_state()
+        if self.response_cache is not None:
+            self.response_cache.clear()
+    
+    @staticmethod
+    def _question_key(text: str) -> str:
+        """Normalize a question for matching against predicted follow-ups"""
+        return _WHITESPACE_RE.sub(' ', text.lower()).strip().rstrip('?.! ')
     
     def _detect_intent(self, text: str) -> str:
         """
@@ -135,94 +416,66 @@ class AssistantCore:
         Returns:
             str: Detected intent
         """
-        text_lower = text.lower()
-        
-        # Web search patterns
-        search_patterns = [
-            r'search (for|about|up)',
-            r'look (up|for)',
-            r'find (information|info|out) (about|on)',
-            r'what is',
-            r'who is',
-            r'where is',
-            r'how to'
-        ]
-        
-        for pattern in search_patterns:
-            if re.search(pattern, text_lower):
-                return 'web_search'
-        
-        # System control patterns
-        control_patterns = [
-            r'open (application|app|program)',
-            r'launch',
-            r'start (application|app|program)',
-            r'run (application|app|program)',
-            r'open (notepad|calculator|explorer|chrome|firefox)'
-        ]
-        
-        for pattern in control_patterns:
-            if re.search(pattern, text_lower):
-                return 'system_control'
-        
-        # File operation patterns
-        file_patterns = [
-            r'read (the |)file',
-            r'write (to |)file',
-            r'create (a |)file',
-            r'list (files|directory)',
-            r'show (files|directory)'
-        ]
-        
-        for pattern in file_patterns:
-            if re.search(pattern, text_lower):
-                return 'file_operation'
-        
-        # System info patterns
-        info_patterns = [
-            r'system (info|information)',
-            r'cpu usage',
-            r'memory usage',
-            r'disk space',
-            r'what are my system specs'
-        ]
-        
-        for pattern in info_patterns:
-            if re.search(pattern, text_lower):
-                return 'system_info'
-        
-        return 'conversation'
-    
-    def _handle_web_search(self, query: str) -> str:
+        return _detect_intent_cached(_WHITESPACE_RE.sub(' ', text.lower()).strip())
+    
+    def _build_app_automaton(self):
+        """
+        Build an Aho-Corasick automaton over the allowed application names
+        
+        Returns:
+            Automaton mapping each lowercased name to (priority, name), or
+            None if pyahocorasick is not installed or the list is empty
+        """
+        if not AHOCORASICK_AVAILABLE or not self._allowed_apps_lower:
+            return None
+        
+        automaton = ahocorasick.Automaton()
+        for priority, (app_lower, app) in enumerate(self._allowed_apps_lower):
+            automaton.add_word(app_lower, (priority, app))
+        automaton.make_automaton()
+        return automaton
+    
+    def _handle_web_search(self, query: str) -> Iterator[str]:
         """Handle web search requests"""
         self.logger.info(f"Handling web search: {query}")
         
         # Extract search query
         search_query = query
-        for prefix in ['search for', 'search about', 'look up', 'find information about']:
-            if prefix in query.lower():
-                search_query = query.lower().split(prefix, 1)[1].strip()
+        query_lower = query.lower()
+        for prefix in _SEARCH_PREFIXES:
+            index = query_lower.find(prefix)
+            if index != -1:
+                search_query = query_lower[index + len(prefix):].strip()
                 break
         
         # Perform search
         results = self.web.search_and_summarize(search_query)
         
         # Generate response with LLM
-        prompt = f"Based on these search results, provide a helpful answer:\n\n{results}\n\nUser question: {query}"
-        llm_response = self.llm.generate_response(prompt, use_history=False)
-        
-        return llm_response
+        prompt = f"{results}\n\nQuestion: {query}"
+        return self.llm.generate_response_stream(prompt, use_history=False,
+                                                 system=self._WEB_SYSTEM_PREFIX)
     
     def _handle_system_control(self, command: str) -> str:
         """Handle system control requests"""
         self.logger.info(f"Handling system control: {command}")
         
-        # Extract application name
+        # Extract application name (earliest entry in the allow-list wins)
         app_name = None
-        for app in self.config['system']['allowed_commands']:
-            if app.lower() in command.lower():
-                app_name = app
-                break
+        command_lower = command.lower()
+        
+        if self._allowed_ac is not None:
+            best = None
+            for _, (priority, app) in self._allowed_ac.iter(command_lower):
+                if best is None or priority < best[0]:
+                    best = (priority, app)
+            if best:
+                app_name = best[1]
+        else:
+            for app_lower, app in self._allowed_apps_lower:
+                if app_lower in command_lower:
+                    app_name = app
+                    break
         
         if app_name:
             success = self.system.open_application(app_name)
@@ -239,14 +492,14 @@ class AssistantCore:
         
         command_lower = command.lower()
         
+        # Extract file or directory path (simple pattern matching)
+        path_match = _PATH_RE.search(command)
+        path = path_match.group(0) if path_match else None
+        
         # Read file
         if 'read' in command_lower:
-            # Extract file path (simple pattern matching)
-            import re
-            path_match = re.search(r'[A-Za-z]:\\[^\s]+|/[^\s]+', command)
-            if path_match:
-                filepath = path_match.group(0)
-                content = self.system.read_file(filepath)
+            if path:
+                content = self.system.read_file(path)
                 if content:
                     return f"File contents:\n\n{content[:500]}..." if len(content) > 500 else f"File contents:\n\n{content}"
                 else:
@@ -256,10 +509,8 @@ class AssistantCore:
         
         # List directory
         elif 'list' in command_lower or 'show' in command_lower:
-            path_match = re.search(r'[A-Za-z]:\\[^\s]+|/[^\s]+', command)
-            if path_match:
-                dirpath = path_match.group(0)
-                items = self.system.list_directory(dirpath)
+            if path:
+                items = self.system.list_directory(path)
                 if items:
                     return f"Directory contents:\n" + "\n".join(f"  - {item}" for item in items[:20])
                 else:
@@ -269,29 +520,159 @@ class AssistantCore:
         
         return "I can help you read files or list directories. Please provide more details."
     
-    def _handle_system_info(self, query: str) -> str:
+    def _handle_system_info(self, query: str) -> Iterator[str]:
         """Handle system information requests"""
         self.logger.info(f"Handling system info: {query}")
         
-        info = self.system.get_system_info()
+        info = self._get_system_info()
+        
+        # Answer bare stat requests directly
+        stat_match = _BARE_STAT_RE.match(_WHITESPACE_RE.sub(' ', query.lower()).strip())
+        if stat_match:
+            answer = self._format_stat(stat_match.group(1), info)
+            if answer:
+                return [answer]
         
         info_text = "System Information:\n"
         for key, value in info.items():
             info_text += f"  {key.replace('_', ' ').title()}: {value}\n"
         
         # Generate natural response with LLM
-        prompt = f"Based on this system information, provide a natural response to the user:\n\n{info_text}\n\nUser question: {query}"
-        response = self.llm.generate_response(prompt, use_history=False)
+        prompt = f"{info_text}\nQuestion: {query}"
+        return self.llm.generate_response_stream(prompt, use_history=False,
+                                                 system=self._SYSINFO_SYSTEM_PREFIX)
+    
+    def _get_system_info(self) -> Dict:
+        """
+        Get system information, reusing a recent snapshot when available
+        
+        Returns:
+            Dictionary with system information
+        """
+        now = time.monotonic()
+        timestamp, info = self._sysinfo_cache
+        
+        if info and now - timestamp < self.config['system'].get('info_ttl', 2.0):
+            return info
         
-        return response
+        info = self.system.get_system_info()
+        self._sysinfo_cache = (now, info)
+        return info
     
-    def _handle_conversation(self, message: str) -> str:
+    @staticmethod
+    def _format_stat(stat: str, info: Dict) -> Optional[str]:
+        """
+        Format a single system stat as a sentence
+        
+        Args:
+            stat: Requested stat ('cpu usage', 'memory usage' or 'disk space')
+            info: System information dictionary
+            
+        Returns:
+            str: Formatted answer, or None if the stat is unavailable
+        """
+        try:
+            if stat == 'cpu usage':
+                return f"CPU usage is currently {info['cpu_percent']}%."
+            elif stat == 'memory usage':
+                return (f"Memory usage is currently {info['memory_percent']}% "
+                        f"({info['memory_available']} available of {info['memory_total']}).")
+            elif stat == 'disk space':
+                return f"Disk usage is currently {info['disk_usage']}."
+        except KeyError:
+            pass
+        return None
+    
+    def _handle_conversation(self, message: str) -> Iterator[str]:
         """Handle general conversation"""
         self.logger.info(f"Handling conversation: {message}")
         
         # Generate response with LLM
-        response = self.llm.generate_response(message, use_history=True)
-        return response
+        return self.llm.generate_response_stream(message, use_history=True)
+    
+    def _prefetch_worker(self):
+        """
+        Background worker that answers likely follow-up questions ahead of
+        time, in the context of the current conversation
+        
+        The answers are kept only until the next user message; they are
+        not put in the response cache, which has no notion of context.
+        """
+        count = self.config['assistant'].get('prefetch_count', 3)
+        
+        while True:
+            item = self._prefetch_queue.get()
+            if item is None:  # Shutdown signal
+                break
+            
+            # Only speculate on the most recent exchange
+            while not self._prefetch_queue.empty():
+                try:
+                    item = self._prefetch_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    return
+            
+            turn, user_input, response = item
+            if turn != self._turn:
+                # The user has already moved on
+                continue
+            
+            answers = {}
+            self._prefetched = (turn, answers)
+            
+            try:
+                prompt = f"User: {user_input}\nAssistant: {response}\n\nList {count} likely follow-up questions."
+                predictions = self._generate_speculative(prompt, turn, system=self._FOLLOWUP_SYSTEM_PREFIX)
+                if predictions is None:
+                    continue
+                
+                questions = [_LIST_MARKER_RE.sub('', line).strip() for line in predictions.splitlines()]
+                for question in [q for q in questions if q][:count]:
+                    if self._turn != turn:
+                        break
+                    if self._detect_intent(question) != 'conversation':
+                        continue
+                    key = self._question_key(question)
+                    if key in answers:
+                        continue
+                    
+                    answer = self._generate_speculative(question, turn, use_history=True)
+                    if answer and not answer.startswith("Error"):
+                        answers[key] = answer
+                        self.logger.debug(f"Prefetched answer for: {question}")
+                        
+            except Exception as e:
+                self.logger.error(f"Error prefetching follow-ups: {e}")
+    
+    def _generate_speculative(self, prompt: str, turn: int, system: Optional[str] = None,
+                              use_history: bool = False) -> Optional[str]:
+        """
+        Generate a response that is abandoned as soon as user input arrives
+        
+        Args:
+            prompt: Prompt text
+            turn: Turn the speculation belongs to
+            system: Optional static instruction placed after the system prompt
+            use_history: Whether to include the conversation history; the
+                exchange itself is never recorded
+            
+        Returns:
+            str: Generated text, or None if preempted
+        """
+        parts = []
+        stream = self.llm.generate_response_stream(prompt, use_history=use_history,
+                                                   system=system, record=False)
+        try:
+            for chunk in stream:
+                if self._turn != turn:
+                    return None
+                parts.append(chunk)
+        finally:
+            # Releases the model lock if generation was cut short
+            stream.close()
+        return "".join(parts)
     
     def process_voice_input(self) -> Optional[str]:
         """
@@ -324,51 +705,74 @@ class AssistantCore:
     
     def start_voice_mode(self):
         """Start voice interaction mode"""
-        print("\n" + "="*60)
-        print("  Voice Mode Activated")
-        print("="*60)
-        print("\nListening for your voice commands...")
-        print("Press Ctrl+C to exit voice mode\n")
+        sys.stdout.write(_VOICE_BANNER)
+        
+        # Keep the microphone open between turns
+        if self.stt:
+            self.stt.enter_session()
         
         try:
             while True:
                 # Listen for input
-                print("Listening...")
+                sys.stdout.write("Listening...\n")
+                sys.stdout.flush()
                 text = self.process_voice_input()
                 
                 if text:
-                    print(f"You said: {text}\n")
+                    sys.stdout.write(f"You said: {text}\n\nAssistant: ")
                     
-                    # Process and respond
-                    response = self.process_message(text)
-                    print(f"Assistant: {response}\n")
+                    # Process and print the response as it streams
+                    chunks = []
+                    for chunk in self.process_message_stream(text):
+                        sys.stdout.write(chunk)
+                        sys.stdout.flush()
+                        chunks.append(chunk)
+                    sys.stdout.write("\n\n")
+                    sys.stdout.flush()
                     
                     # Speak response
-                    self.speak_response(response, blocking=True)
+                    self.speak_response("".join(chunks), blocking=True)
                 else:
-                    print("Sorry, I didn't catch that.\n")
+                    sys.stdout.write("Sorry, I didn't catch that.\n\n")
                 
         except KeyboardInterrupt:
             print("\n\nExiting voice mode...")
+        finally:
+            if self.stt:
+                self.stt.exit_session()
     
     def shutdown(self):
-        """Shutdown all modules and cleanup"""
-        self.logger.info("Shutting down assistant...")
+        """Shutdown all modules and cleanup; later calls are no-ops"""
+        if self._shut_down:
+            return
+        self._shut_down = True
         
-        if self.llm:
-            self.llm.unload_model()
-        
-        if self.tts:
-            self.tts.shutdown()
-        
-        if self.stt:
-            self.stt.shutdown()
+        self.logger.info("Shutting down assistant...")
         
-        if self.web:
-            self.web.shutdown()
+        if self._prefetch_thread:
+            self._turn += 1
+            self._prefetch_queue.put(None)
+            self._prefetch_thread.join(timeout=2.0)
         
-        if self.system:
-            self.system.shutdown()
+        # Modules are independent, so tear them down concurrently; exit
+        # latency is then bounded by the slowest one (usually the LLM)
+        teardown = {}
+        if self.llm:
+            teardown['llm'] = self.llm.unload_model
+        for name in ('tts', 'stt', 'web', 'system'):
+            module = getattr(self, name)
+            if module:
+                teardown[name] = module.shutdown
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
+            futures = {name: executor.submit(func) for name, func in teardown.items()}
+            concurrent.futures.wait(futures.values())
+        
+        # One failing module must not keep the others from shutting down
+        for name, future in futures.items():
+            error = future.exception()
+            if error:
+                self.logger.error(f"Error shutting down {name}: {error}")
         
         self.logger.info("Assistant shutdown complete")
 
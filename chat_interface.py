@@ -4,9 +4,85 @@ Provides interactive text communication with the assistant
 """
 
 import logging
-from typing import Dict, Optional, Callable
+from typing import Dict, Optional, Callable, Mapping, Sequence
 import sys
-from datetime import datetime
+import asyncio
+import threading
+import queue
+import time
+import collections.abc
+from collections import deque
+from types import MappingProxyType
+
+
+_SEPARATOR = "="*60
+
+_WELCOME_TEMPLATE = (
+    "\n" + _SEPARATOR + "\n"
+    "  {name} - AI Assistant\n"
+    + _SEPARATOR + "\n"
+    "\nWelcome! I'm your AI assistant. I can help you with:\n"
+    "  • Answer questions and have conversations\n"
+    "  • Search the web for information\n"
+    "  • Control system applications\n"
+    "  • Read and write files\n"
+    "\nCommands:\n"
+    "  /help    - Show help\n"
+    "  /clear   - Clear conversation history\n"
+    "  /history - Show conversation history\n"
+    "  /quit    - Exit the assistant\n"
+    "\nType your message and press Enter to chat.\n"
+    + _SEPARATOR + "\n\n"
+)
+
+_GOODBYE_TEMPLATE = (
+    "\n" + _SEPARATOR + "\n"
+    "  Thank you for using {name}!\n"
+    + _SEPARATOR + "\n\n"
+)
+
+_HELP_TEXT = (
+    "\n" + _SEPARATOR + "\n"
+    "  Available Commands\n"
+    + _SEPARATOR + "\n"
+    "\n/help    - Show this help message\n"
+    "/clear   - Clear conversation history\n"
+    "/history - Show conversation history\n"
+    "/cachestats - Show cache statistics\n"
+    "/quit    - Exit the assistant\n"
+    "\nYou can also ask me to:\n"
+    "  • Search the web: 'Search for Python tutorials'\n"
+    "  • Open apps: 'Open notepad'\n"
+    "  • Get system info: 'What is my CPU usage?'\n"
+    "  • Read files: 'Read the file at C:\\...'\n"
+    + _SEPARATOR + "\n\n"
+)
+
+
+class _LogView(collections.abc.Sequence):
+    """Read-only sequence over the live conversation log deque"""
+    
+    __slots__ = ('_log',)
+    
+    def __init__(self, log: deque):
+        self._log = log
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self._log)[index]
+        return self._log[index]
+    
+    def __len__(self) -> int:
+        return len(self._log)
+    
+    def __iter__(self):
+        return iter(self._log)
+    
+    def __reversed__(self):
+        return reversed(self._log)
+    
+    def __contains__(self, value) -> bool:
+        return value in self._log
 
 
 class ChatInterface:
@@ -26,8 +102,21 @@ class ChatInterface:
         self.assistant_name = config.get('name', 'Assistant')
         self.running = False
         self.message_callback: Optional[Callable] = None
+        self.stats_callback: Optional[Callable] = None
+        self.clear_callback: Optional[Callable] = None
         self.log_conversations = config.get('log_conversations', True)
-        self.conversation_log = []
+        self.conversation_log = deque(maxlen=config.get('max_log', 10000))
+        
+        # Log entries are appended by a single background writer so the
+        # chat loop never waits on logging
+        self._log_queue = queue.Queue()
+        threading.Thread(target=self._log_worker, daemon=True).start()
+        
+        # Responses stream on a daemon thread; on exit it is told to stop
+        # and waited for, so the model is never unloaded mid-generation
+        self._cancel = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
         
         self.logger = logging.getLogger(__name__)
     
@@ -36,15 +125,46 @@ class ChatInterface:
         Set callback function for processing messages
         
         Args:
-            callback: Function that takes user input and returns response
+            callback: Function that takes user input and returns either the
+                response string or an iterable of response chunks to stream
         """
         self.message_callback = callback
     
+    def set_stats_callback(self, callback: Callable):
+        """
+        Set callback function for reporting cache statistics
+        
+        Args:
+            callback: Function that returns a dictionary of statistics
+        """
+        self.stats_callback = callback
+    
+    def set_clear_callback(self, callback: Callable):
+        """
+        Set callback function invoked when the conversation is cleared
+        
+        Args:
+            callback: Function that takes no arguments
+        """
+        self.clear_callback = callback
+    
     def start(self):
         """Start the chat interface"""
         self.running = True
+        self._cancel.clear()
         self._print_welcome()
-        self._chat_loop()
+        
+        try:
+            asyncio.run(self._chat_loop_async())
+        except KeyboardInterrupt:
+            print("\n")
+            self._cancel_response()
+            self.stop()
+    
+    def _cancel_response(self):
+        """Stop a response that is still streaming and wait for it to end"""
+        self._cancel.set()
+        self._idle.wait()
     
     def stop(self):
         """Stop the chat interface"""
@@ -53,69 +173,140 @@ class ChatInterface:
     
     def _print_welcome(self):
         """Print welcome message"""
-        print("\n" + "="*60)
-        print(f"  {self.assistant_name} - AI Assistant")
-        print("="*60)
-        print("\nWelcome! I'm your AI assistant. I can help you with:")
-        print("  • Answer questions and have conversations")
-        print("  • Search the web for information")
-        print("  • Control system applications")
-        print("  • Read and write files")
-        print("\nCommands:")
-        print("  /help    - Show help")
-        print("  /clear   - Clear conversation history")
-        print("  /history - Show conversation history")
-        print("  /quit    - Exit the assistant")
-        print("\nType your message and press Enter to chat.")
-        print("="*60 + "\n")
+        sys.stdout.write(_WELCOME_TEMPLATE.format(name=self.assistant_name))
+        sys.stdout.flush()
     
     def _print_goodbye(self):
         """Print goodbye message"""
-        print("\n" + "="*60)
-        print(f"  Thank you for using {self.assistant_name}!")
-        print("="*60 + "\n")
+        sys.stdout.write(_GOODBYE_TEMPLATE.format(name=self.assistant_name))
+        sys.stdout.flush()
     
-    def _chat_loop(self):
-        """Main chat loop"""
-        while self.running:
-            try:
-                # Get user input
-                user_input = self._get_user_input()
-                
-                if not user_input:
-                    continue
-                
-                # Check for commands
-                if user_input.startswith('/'):
-                    self._handle_command(user_input)
-                    continue
-                
-                # Process message through callback
-                if self.message_callback:
-                    print(f"\n{self.assistant_name}: ", end='', flush=True)
+    async def _chat_loop_async(self):
+        """
+        Main chat loop
+        
+        User input is read off the event loop and published to a message
+        bus; responses are handled by a separate consumer.
+        """
+        self.bus = asyncio.Queue()
+        consumer = asyncio.create_task(self._message_consumer())
+        
+        try:
+            while self.running:
+                try:
+                    # Get user input
+                    user_input = await self._run_in_thread(self._get_user_input)
+                    
+                    if not user_input:
+                        continue
+                    
+                    # Check for commands
+                    if user_input.startswith('/'):
+                        self._handle_command(user_input)
+                        continue
                     
-                    response = self.message_callback(user_input)
-                    print(response)
+                    # Publish the utterance and wait for the response to finish
+                    # printing before prompting again
+                    await self.bus.put(('user_utterance', user_input))
+                    await self.bus.join()
                     
-                    # Log conversation
-                    if self.log_conversations:
-                        self._log_message("user", user_input)
-                        self._log_message("assistant", response)
-                else:
-                    print(f"\n{self.assistant_name}: Error - No message handler configured")
-                
-                print()  # Empty line for spacing
-                
-            except KeyboardInterrupt:
-                print("\n")
-                self.stop()
-                break
-            except EOFError:
-                self.stop()
-                break
+                except EOFError:
+                    self.stop()
+                    break
+                except Exception as e:
+                    self.logger.error(f"Error in chat loop: {e}")
+                    print(f"\nError: {e}\n")
+        finally:
+            consumer.cancel()
+    
+    async def _message_consumer(self):
+        """Consume user utterances from the bus and print responses"""
+        while True:
+            _, user_input = await self.bus.get()
+            try:
+                response = await self._run_in_thread(self._respond, user_input)
+                if response is not None and self.log_conversations:
+                    self._log_message("user", user_input)
+                    self._log_message("assistant", response)
             except Exception as e:
                 self.logger.error(f"Error in chat loop: {e}")
                 print(f"\nError: {e}\n")
+            finally:
+                self.bus.task_done()
+    
+    @staticmethod
+    def _run_in_thread(func: Callable, *args) -> "asyncio.Future":
+        """
+        Run a blocking function in a daemon thread
+        
+        Daemon threads are used instead of the default executor so that a
+        pending input() call never keeps the process alive on exit.
+        
+        Args:
+            func: Function to call
+            *args: Arguments for the function
+            
+        Returns:
+            Future resolved with the function's result
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        
+        def worker():
+            try:
+                result = func(*args)
+                loop.call_soon_threadsafe(future.set_result, result)
+            except Exception as e:
+                loop.call_soon_threadsafe(future.set_exception, e)
+        
+        threading.Thread(target=worker, daemon=True).start()
+        return future
+    
+    def _respond(self, user_input: str) -> Optional[str]:
+        """
+        Process a message through the callback and print the response
+        
+        Args:
+            user_input: User input text
+            
+        Returns:
+            str: Full response text, or None if no handler is configured
+        """
+        if not self.message_callback:
+            print(f"\n{self.assistant_name}: Error - No message handler configured\n")
+            return None
+        
+        print(f"\n{self.assistant_name}: ", end='', flush=True)
+        
+        self._idle.clear()
+        try:
+            result = self.message_callback(user_input)
+            
+            if isinstance(result, str):
+                response = result
+                sys.stdout.write(response)
+            else:
+                # Print chunks as they arrive
+                chunks = []
+                try:
+                    for chunk in result:
+                        if self._cancel.is_set():
+                            break
+                        sys.stdout.write(chunk)
+                        sys.stdout.flush()
+                        chunks.append(chunk)
+                finally:
+                    # Closing the stream releases the model before we report idle
+                    close = getattr(result, 'close', None)
+                    if close:
+                        close()
+                response = "".join(chunks)
+            sys.stdout.write("\n\n")
+            sys.stdout.flush()
+        finally:
+            self._idle.set()
+        
+        return response
     
     def _get_user_input(self) -> str:
         """
@@ -148,6 +339,8 @@ class ChatInterface:
             self._clear_history()
         elif cmd == '/history':
             self._show_history()
+        elif cmd == '/cachestats':
+            self._show_cache_stats()
         elif cmd == '/quit' or cmd == '/exit':
             self.stop()
         else:
@@ -156,27 +349,20 @@ class ChatInterface:
     
     def _show_help(self):
         """Show help information"""
-        print("\n" + "="*60)
-        print("  Available Commands")
-        print("="*60)
-        print("\n/help    - Show this help message")
-        print("/clear   - Clear conversation history")
-        print("/history - Show conversation history")
-        print("/quit    - Exit the assistant")
-        print("\nYou can also ask me to:")
-        print("  • Search the web: 'Search for Python tutorials'")
-        print("  • Open apps: 'Open notepad'")
-        print("  • Get system info: 'What is my CPU usage?'")
-        print("  • Read files: 'Read the file at C:\\...'")
-        print("="*60 + "\n")
+        sys.stdout.write(_HELP_TEXT)
+        sys.stdout.flush()
     
     def _clear_history(self):
         """Clear conversation history"""
+        self._log_queue.join()
         self.conversation_log.clear()
+        if self.clear_callback:
+            self.clear_callback()
         print(f"\n{self.assistant_name}: Conversation history cleared.\n")
     
     def _show_history(self):
         """Show conversation history"""
+        self._log_queue.join()
         if not self.conversation_log:
             print(f"\n{self.assistant_name}: No conversation history yet.\n")
             return
@@ -186,7 +372,7 @@ class ChatInterface:
         print("="*60 + "\n")
         
         for entry in self.conversation_log:
-            timestamp = entry['timestamp']
+            timestamp = self._format_timestamp(entry['timestamp'])
             role = entry['role'].capitalize()
             message = entry['message']
             
@@ -194,19 +380,57 @@ class ChatInterface:
         
         print("="*60 + "\n")
     
+    def _show_cache_stats(self):
+        """Show cache statistics"""
+        if not self.stats_callback:
+            print(f"\n{self.assistant_name}: Cache statistics are not available.\n")
+            return
+        
+        print("\n" + "="*60)
+        print("  Cache Statistics")
+        print("="*60 + "\n")
+        
+        for key, value in self.stats_callback().items():
+            print(f"  {key.replace('_', ' ').title()}: {value}")
+        
+        print("\n" + "="*60 + "\n")
+    
     def _log_message(self, role: str, message: str):
         """
-        Log a message to conversation history
+        Queue a message for the conversation history
         
         Args:
             role: Role (user or assistant)
             message: Message text
         """
-        self.conversation_log.append({
-            'timestamp': datetime.now().strftime("%H:%M:%S"),
-            'role': role,
-            'message': message
-        })
+        self._log_queue.put((time.time(), role, message))
+    
+    def _log_worker(self):
+        """Append queued messages to the conversation log"""
+        while True:
+            timestamp, role, message = self._log_queue.get()
+            try:
+                # Entries are shared with readers of the log view, so freeze them
+                self.conversation_log.append(MappingProxyType({
+                    'timestamp': timestamp,
+                    'role': role,
+                    'message': message
+                }))
+            finally:
+                self._log_queue.task_done()
+    
+    @staticmethod
+    def _format_timestamp(timestamp: float) -> str:
+        """
+        Format a log timestamp for display
+        
+        Args:
+            timestamp: Seconds since the epoch
+            
+        Returns:
+            str: Local time as HH:MM:SS
+        """
+        return time.strftime("%H:%M:%S", time.localtime(timestamp))
     
     def display_message(self, message: str, role: str = "assistant"):
         """
@@ -224,14 +448,26 @@ class ChatInterface:
         if self.log_conversations:
             self._log_message(role, message)
     
-    def get_conversation_log(self) -> list:
+    @property
+    def conversation_log_view(self) -> Sequence[Mapping]:
         """
-        Get the conversation log
+        Read-only view of the conversation log, without copying it
+        
+        The view reflects later messages; use get_conversation_log for a
+        snapshot.
+        """
+        self._log_queue.join()
+        return _LogView(self.conversation_log)
+    
+    def get_conversation_log(self) -> tuple:
+        """
+        Get a snapshot of the conversation log
         
         Returns:
-            List of conversation entries
+            Tuple of conversation entries
         """
-        return self.conversation_log.copy()
+        self._log_queue.join()
+        return tuple(self.conversation_log)
     
     def save_conversation(self, filepath: str) -> bool:
         """
@@ -243,18 +479,23 @@ class ChatInterface:
         Returns:
             bool: True if successful
         """
+        # Make sure queued messages are included
+        self._log_queue.join()
+        
         try:
+            # Build the whole file in memory and write it once
+            parts = [
+                "="*60 + "\n",
+                f"  {self.assistant_name} - Conversation Log\n",
+                "="*60 + "\n\n"
+            ]
+            parts.extend(
+                f"[{self._format_timestamp(entry['timestamp'])}] {entry['role'].capitalize()}:\n{entry['message']}\n\n"
+                for entry in self.conversation_log
+            )
+            
             with open(filepath, 'w', encoding='utf-8') as f:
-                f.write("="*60 + "\n")
-                f.write(f"  {self.assistant_name} - Conversation Log\n")
-                f.write("="*60 + "\n\n")
-                
-                for entry in self.conversation_log:
-                    timestamp = entry['timestamp']
-                    role = entry['role'].capitalize()
-                    message = entry['message']
-                    
-                    f.write(f"[{timestamp}] {role}:\n{message}\n\n")
+                f.write("".join(parts))
             
             self.logger.info(f"Conversation saved to: {filepath}")
             return True
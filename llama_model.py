@@ -4,16 +4,107 @@ Handles all LLM inference with GPU acceleration
 """
 
 import logging
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator
+from collections import OrderedDict, deque
+from array import array
+import hashlib
+import inspect
 import json
+import itertools
+import os
+import struct
+import sys
+import threading
+import time
 
 try:
-    from llama_cpp import Llama
+    import numpy as np
+    from llama_cpp import Llama, LlamaRAMCache, LlamaState
     LLAMA_AVAILABLE = True
 except ImportError:
     LLAMA_AVAILABLE = False
     logging.warning("llama-cpp-python not installed. LLM features will be limited.")
 
+try:
+    import pynvml
+    NVML_AVAILABLE = True
+except ImportError:
+    # n_gpu_layers "auto" then falls back to the default
+    NVML_AVAILABLE = False
+
+try:
+    from llama_cpp.llama_speculative import LlamaDraftModel
+    SPECULATIVE_AVAILABLE = True
+except ImportError:
+    # draft_model_path is then ignored and decoding is not speculative
+    LlamaDraftModel = object
+    SPECULATIVE_AVAILABLE = False
+
+
+_DEFAULT_GPU_LAYERS = 35
+
+# Messages kept in the conversation history (10 exchanges)
+_MAX_HISTORY_MESSAGES = 20
+# Above this temperature completions are too random to reuse
+_CACHEABLE_TEMPERATURE = 0.1
+
+# VRAM left free for llama.cpp compute buffers when auto-tuning
+_VRAM_HEADROOM = 512 << 20
+
+# Saved model state: magic, header length, JSON header, then raw arrays
+_STATE_MAGIC = b'JKV1'
+_STATE_HEADER = struct.Struct('<4sI')
+
+
+def _default_state_file() -> str:
+    """Get the per-user path of the saved warm-up state"""
+    base = os.environ.get('LOCALAPPDATA') if os.name == 'nt' else os.environ.get('XDG_CACHE_HOME')
+    return os.path.join(base or os.path.expanduser(os.path.join('~', '.cache')),
+                        'jarvis', 'kv_state.bin')
+
+
+# KV cache element types: name -> (ggml type id, bytes per element)
+_KV_TYPES = {
+    'f16': (1, 2.0),
+    'q8_0': (8, 34 / 32),
+    'q4_0': (2, 18 / 32)
+}
+
+
+class SmallModelDraft(LlamaDraftModel):
+    """
+    Draft model for speculative decoding backed by a small Llama
+    The target model verifies all drafted tokens in one forward pass
+    """
+    
+    def __init__(self, model, num_pred_tokens: int = 8):
+        """
+        Initialize the draft model
+        
+        Args:
+            model: Small Llama instance sharing the target's tokenizer
+            num_pred_tokens: Number of tokens to draft per step
+        """
+        self.model = model
+        self.num_pred_tokens = num_pred_tokens
+    
+    def __call__(self, input_ids, /, **kwargs):
+        """
+        Greedily draft the next tokens for the given context
+        
+        Args:
+            input_ids: Token ids evaluated by the target model so far
+            
+        Returns:
+            Array of drafted token ids
+        """
+        # generate() reuses the longest evaluated prefix, so each step only
+        # evaluates the tokens accepted since the previous draft
+        eos = self.model.token_eos()
+        drafted = self.model.generate(input_ids.tolist(), top_k=1, top_p=1.0, temp=0.0, reset=True)
+        drafted = itertools.takewhile(lambda token: token != eos, drafted)
+        return np.array(list(itertools.islice(drafted, self.num_pred_tokens)), dtype=np.intc)
+
 
 class LlamaModel:
     """
@@ -30,7 +121,22 @@ class LlamaModel:
         """
         self.config = config
         self.model = None
-        self.conversation_history: List[Dict[str, str]] = []
+        self._metadata: Optional[Dict[str, str]] = None
+        self.conversation_history: deque = deque(maxlen=_MAX_HISTORY_MESSAGES)
+        # Token ids of each history message as laid out in the prompt
+        self._history_tokens: deque = deque(maxlen=_MAX_HISTORY_MESSAGES)
+        # Token ids of the current history window joined together
+        self._window_tokens: Optional[List[int]] = None
+        # Token ids of the static prompt prefix, keyed by extra instruction
+        self._prefix_tokens: Dict[Optional[str], List[int]] = {}
+        # Index of the first history message included in prompts
+        self._window_start = 0
+        # Prompt tokens of the last call, for reporting KV cache reuse
+        self._evaluated_tokens: List[int] = []
+        # llama.cpp contexts are not thread-safe; serialize model calls
+        self._lock = threading.RLock()
+        # Completions keyed by a digest of the full prompt, in LRU order
+        self._completions: OrderedDict = OrderedDict()
         self.system_prompt = """You are Jarvis, a helpful AI assistant with access to the internet and system controls. 
 You can help with questions, search the web for information, and control system applications when requested.
 Be concise, helpful, and friendly in your responses."""
@@ -51,14 +157,70 @@ Be concise, helpful, and friendly in your responses."""
         try:
             self.logger.info(f"Loading model from {self.config['model_path']}")
             
+            override_tensor = self.config.get('override_tensor', 'auto')
+            if override_tensor == 'auto':
+                override_tensor = self._auto_override_tensor()
+            
+            # Llama() silently drops keyword arguments it does not know, so an
+            # unsupported override would leave the experts on the GPU
+            if override_tensor and 'override_tensor' not in inspect.signature(Llama.__init__).parameters:
+                self.logger.warning("This llama-cpp-python does not support override_tensor, ignoring it")
+                override_tensor = None
+            
+            n_gpu_layers = self.config.get('n_gpu_layers', _DEFAULT_GPU_LAYERS)
+            if n_gpu_layers == 'auto':
+                # With the experts kept on the CPU the rest goes on the GPU
+                n_gpu_layers = -1 if override_tensor else self._auto_gpu_layers()
+                self.logger.info(f"Auto-selected n_gpu_layers={n_gpu_layers}")
+            
+            type_k, type_v = self._kv_types()
+            draft_model = self._load_draft_model()
+            
             self.model = Llama(
                 model_path=self.config['model_path'],
-                n_gpu_layers=self.config.get('n_gpu_layers', 35),
+                n_gpu_layers=n_gpu_layers,
+                # Multi-GPU placement: 0 = single GPU, 1 = split layers,
+                # 2 = split rows; tensor_split gives per-GPU proportions
+                split_mode=self.config.get('split_mode', 1),
+                tensor_split=self.config.get('tensor_split'),
+                main_gpu=self.config.get('main_gpu', 0),
+                # Tensor placement overrides, e.g. "exps=CPU" for MoE experts
+                override_tensor=override_tensor,
+                flash_attn=self.config.get('flash_attn', True),
                 n_ctx=self.config.get('n_ctx', 4096),
+                # Quantized KV cache halves the bytes read per decode step
+                type_k=_KV_TYPES[type_k][0],
+                type_v=_KV_TYPES[type_v][0],
+                # Prompt tokens evaluated per forward pass during prefill
+                n_batch=self.config.get('n_batch', 512),
                 n_threads=self.config.get('n_threads', 8),
+                # Map the weights and pin them in RAM so they are not paged out
+                use_mmap=True,
+                use_mlock=self.config.get('mlock', True),
+                draft_model=draft_model,
                 verbose=self.config.get('verbose', False)
             )
             
+            # Token ids cached for a previous model may not match this vocabulary
+            self._prefix_tokens.clear()
+            self._completions.clear()
+            self._history_tokens = deque((self._tokenize(self._message_text(msg))
+                                          for msg in self.conversation_history),
+                                         maxlen=_MAX_HISTORY_MESSAGES)
+            self._window_tokens = None
+            
+            # Opt-in: keep evaluated prompt states in RAM so a call whose
+            # prefix differs from the previous one (e.g. alternating system
+            # prompts) only evaluates the suffix after its longest cached
+            # prefix. Every completion saves its state into the cache, which
+            # costs a full KV copy per call and only pays off in that case
+            if self.config.get('prompt_cache', False):
+                cache_mb = self.config.get('prompt_cache_mb', 512)
+                self.model.set_cache(LlamaRAMCache(capacity_bytes=cache_mb << 20))
+            
+            if self.config.get('warmup', True):
+                self._warm_up()
+            
             self.logger.info("Model loaded successfully with GPU acceleration")
             return True
             
@@ -66,80 +228,510 @@ Be concise, helpful, and friendly in your responses."""
             self.logger.error(f"Failed to load model: {e}")
             return False
     
-    def generate_response(self, prompt: str, use_history: bool = True) -> str:
+    def _kv_types(self) -> tuple:
+        """
+        Get the configured KV cache types
+        
+        Returns:
+            Tuple of (type_k, type_v) names
+        """
+        type_k = self.config.get('kv_type_k', 'q8_0')
+        type_v = self.config.get('kv_type_v', 'q8_0')
+        
+        for name in (type_k, type_v):
+            if name not in _KV_TYPES:
+                raise ValueError(f"Unsupported KV cache type: {name}")
+        
+        # llama.cpp can only quantize the V cache with flash attention
+        if type_v != 'f16' and not self.config.get('flash_attn', True):
+            self.logger.warning("Quantized V cache requires flash_attn, using f16")
+            type_v = 'f16'
+        
+        return type_k, type_v
+    
+    def _load_draft_model(self) -> Optional[SmallModelDraft]:
+        """
+        Load the small draft model used for speculative decoding
+        
+        Returns:
+            Draft model, or None if not configured or unavailable
+        """
+        draft_path = self.config.get('draft_model_path')
+        if not draft_path:
+            return None
+        
+        if not SPECULATIVE_AVAILABLE:
+            self.logger.warning("Speculative decoding not supported by this llama-cpp-python, ignoring draft model")
+            return None
+        
+        try:
+            self.logger.info(f"Loading draft model from {draft_path}")
+            draft = Llama(
+                model_path=draft_path,
+                n_gpu_layers=self.config.get('draft_n_gpu_layers', -1),
+                n_ctx=self.config.get('n_ctx', 4096),
+                n_threads=self.config.get('n_threads', 8),
+                verbose=False
+            )
+            return SmallModelDraft(draft, self.config.get('n_draft', 8))
+            
+        except Exception as e:
+            self.logger.warning(f"Failed to load draft model, decoding without it: {e}")
+            return None
+    
+    def _warm_up(self):
+        """
+        Evaluate the system prompt once so the first query starts warm
+        
+        Touches the weights and leaves the shared prompt prefix in the
+        KV cache, so the first real request skips both. The resulting
+        state is saved to disk and restored on the next start instead of
+        being evaluated again.
+        """
+        try:
+            start = time.perf_counter()
+            state_file = self.config.get('state_file', _default_state_file())
+            if state_file:
+                state_file = os.path.expanduser(state_file)
+            key = self._state_key()
+            
+            with self._lock:
+                if state_file and self._load_state_file(state_file, key):
+                    self.logger.info(f"Restored model state in {time.perf_counter() - start:.2f}s")
+                    return
+                
+                self.model(self._get_prefix_tokens(), max_tokens=1)
+                self.logger.info(f"Model warm-up took {time.perf_counter() - start:.2f}s")
+                
+                if state_file:
+                    self._save_state_file(state_file, key)
+        except Exception as e:
+            self.logger.warning(f"Model warm-up failed: {e}")
+    
+    def _state_key(self) -> tuple:
+        """
+        Identify what a saved model state depends on
+        
+        Returns:
+            Tuple that changes whenever a saved state would be invalid
+        """
+        stat = os.stat(self.config['model_path'])
+        return (
+            os.path.abspath(self.config['model_path']), stat.st_size, stat.st_mtime_ns,
+            self.config.get('n_ctx', 4096), list(self._kv_types()), self.system_prompt
+        )
+    
+    def _load_state_file(self, state_file: str, key: tuple) -> bool:
+        """
+        Restore a saved model state if it matches the current setup
+        
+        Args:
+            state_file: Path of the saved state
+            key: Expected state key
+            
+        Returns:
+            bool: True if the state was restored
+        """
+        if not os.path.exists(state_file):
+            return False
+        
+        try:
+            # Plain data only, so a planted file cannot run code
+            with open(state_file, 'rb') as f:
+                magic, header_size = _STATE_HEADER.unpack(f.read(_STATE_HEADER.size))
+                if magic != _STATE_MAGIC:
+                    return False
+                header = json.loads(f.read(header_size))
+                if header['key'] != list(key):
+                    return False
+                
+                arrays = {}
+                for name in ('input_ids', 'scores'):
+                    dtype, shape, size = header[name]
+                    arrays[name] = np.frombuffer(f.read(size), dtype=dtype).reshape(shape)
+                llama_state = f.read(header['llama_state_size'])
+            
+            self.model.load_state(LlamaState(
+                input_ids=arrays['input_ids'].copy(),
+                scores=arrays['scores'].copy(),
+                n_tokens=header['n_tokens'],
+                llama_state=llama_state,
+                llama_state_size=header['llama_state_size'],
+                seed=header['seed']
+            ))
+            return True
+        except Exception as e:
+            self.logger.warning(f"Could not restore model state: {e}")
+            return False
+    
+    def _save_state_file(self, state_file: str, key: tuple):
+        """
+        Save the current model state for the next start
+        
+        Args:
+            state_file: Path to save the state to
+            key: State key stored alongside the state
+        """
+        try:
+            state = self.model.save_state()
+            input_ids = np.ascontiguousarray(state.input_ids)
+            scores = np.ascontiguousarray(state.scores)
+            llama_state = bytes(state.llama_state[:state.llama_state_size])
+            header = json.dumps({
+                'key': list(key),
+                'input_ids': [input_ids.dtype.str, input_ids.shape, input_ids.nbytes],
+                'scores': [scores.dtype.str, scores.shape, scores.nbytes],
+                'n_tokens': state.n_tokens,
+                'llama_state_size': len(llama_state),
+                'seed': state.seed
+            }).encode('utf-8')
+            
+            os.makedirs(os.path.dirname(os.path.abspath(state_file)), exist_ok=True)
+            tmp_file = state_file + '.tmp'
+            with open(tmp_file, 'wb') as f:
+                f.write(_STATE_HEADER.pack(_STATE_MAGIC, len(header)))
+                f.write(header)
+                f.write(input_ids.tobytes())
+                f.write(scores.tobytes())
+                f.write(llama_state)
+            os.replace(tmp_file, state_file)
+        except Exception as e:
+            self.logger.warning(f"Could not save model state: {e}")
+    
+    def _auto_gpu_layers(self) -> int:
+        """
+        Pick the largest n_gpu_layers that fits in free VRAM
+        
+        Returns:
+            int: Number of layers to offload, or -1 for all of them
+        """
+        if not NVML_AVAILABLE:
+            self.logger.warning("pynvml not installed, using default n_gpu_layers")
+            return _DEFAULT_GPU_LAYERS
+        
+        try:
+            free_bytes = self._free_vram()
+            
+            model_path = self.config['model_path']
+            metadata = self._read_metadata()
+            arch = metadata['general.architecture']
+            n_layer = int(metadata[f'{arch}.block_count'])
+            n_embd = int(metadata[f'{arch}.embedding_length'])
+            n_head = int(metadata[f'{arch}.attention.head_count'])
+            n_head_kv = int(metadata.get(f'{arch}.attention.head_count_kv', n_head))
+            
+            # Weights are spread roughly evenly over the blocks plus the
+            # embedding/output tensors; each layer also holds its K and V
+            layer_bytes = os.path.getsize(model_path) / (n_layer + 1)
+            type_k, type_v = self._kv_types()
+            kv_bytes = (_KV_TYPES[type_k][1] + _KV_TYPES[type_v][1]) * \
+                self.config.get('n_ctx', 4096) * n_embd * n_head_kv / n_head
+            
+            n_gpu_layers = int((free_bytes - _VRAM_HEADROOM) // (layer_bytes + kv_bytes))
+            if n_gpu_layers > n_layer:
+                return -1
+            return max(0, n_gpu_layers)
+            
+        except Exception as e:
+            self.logger.warning(f"Could not auto-tune n_gpu_layers, using default: {e}")
+            return _DEFAULT_GPU_LAYERS
+    
+    def _auto_override_tensor(self) -> Optional[str]:
+        """
+        Keep MoE expert tensors on the CPU when the model does not fit in VRAM
+        
+        Experts are large but only a few are active per token, so leaving
+        them in system RAM costs far less than moving attention off the GPU.
+        
+        Returns:
+            str: Tensor override pattern, or None to keep the default placement
+        """
+        try:
+            metadata = self._read_metadata()
+            arch = metadata['general.architecture']
+            if int(metadata.get(f'{arch}.expert_count', 0)) == 0:
+                return None
+            
+            if NVML_AVAILABLE:
+                model_bytes = os.path.getsize(self.config['model_path'])
+                if model_bytes + _VRAM_HEADROOM < self._free_vram():
+                    return None
+            
+            self.logger.info("MoE model detected, keeping expert tensors on the CPU")
+            return "exps=CPU"
+            
+        except Exception as e:
+            self.logger.warning(f"Could not inspect model for tensor overrides: {e}")
+            return None
+    
+    def _read_metadata(self) -> Dict[str, str]:
+        """
+        Read the GGUF metadata without loading the weights
+        
+        Returns:
+            Dictionary of GGUF metadata keys and values
+        """
+        if self._metadata is None:
+            self._metadata = Llama(model_path=self.config['model_path'],
+                                   vocab_only=True, verbose=False).metadata
+        return self._metadata
+    
+    def _free_vram(self) -> int:
+        """
+        Get free memory on the main GPU via NVML
+        
+        Returns:
+            int: Free VRAM in bytes
+        """
+        pynvml.nvmlInit()
+        try:
+            handle = pynvml.nvmlDeviceGetHandleByIndex(self.config.get('main_gpu', 0))
+            return pynvml.nvmlDeviceGetMemoryInfo(handle).free
+        finally:
+            pynvml.nvmlShutdown()
+    
+    def generate_response(self, prompt: str, use_history: bool = True,
+                          system: Optional[str] = None) -> str:
         """
         Generate a response from the LLM
         
         Args:
             prompt: User input text
             use_history: Whether to include conversation history
+            system: Optional static instruction placed after the system prompt
             
         Returns:
             str: Generated response from the LLM
         """
+        # Same code path as streaming; the chunks are simply collected
+        return "".join(self.generate_response_stream(prompt, use_history, system)).strip()
+    
+    def generate_response_stream(self, prompt: str, use_history: bool = True,
+                                 system: Optional[str] = None,
+                                 record: bool = True) -> Iterator[str]:
+        """
+        Generate a response from the LLM, yielding text as it is produced
+        
+        Args:
+            prompt: User input text
+            use_history: Whether to include conversation history
+            system: Optional static instruction placed after the system prompt
+            record: Whether to add the exchange to the history (with use_history)
+            
+        Yields:
+            str: Chunks of the generated response
+        """
         if not self.model:
-            return "Error: Model not loaded. Please load the model first."
+            yield "Error: Model not loaded. Please load the model first."
+            return
         
         try:
-            # Build the full prompt with system message and history
-            full_prompt = self._build_prompt(prompt, use_history)
-            
-            # Generate response
-            response = self.model(
-                full_prompt,
-                max_tokens=self.config.get('max_tokens', 512),
-                temperature=self.config.get('temperature', 0.7),
-                top_p=self.config.get('top_p', 0.95),
-                repeat_penalty=self.config.get('repeat_penalty', 1.1),
-                stop=["User:", "Human:", "\n\n\n"]
-            )
+            prompt_tokens = self._build_prompt_tokens(prompt, use_history, system)
             
-            # Extract the generated text
-            generated_text = response['choices'][0]['text'].strip()
+            # The prompt tokens cover the system prompt, history and input,
+            # so identical prompts can reuse a deterministic completion
+            cache_key = self._completion_key(prompt_tokens)
+            if cache_key is not None:
+                with self._lock:
+                    cached = self._completions.get(cache_key)
+                    if cached is not None:
+                        self._completions.move_to_end(cache_key)
+                if cached is not None:
+                    self.logger.debug("Serving completion from the response cache")
+                    yield cached
+                    if use_history and record:
+                        self._update_history(prompt, cached.strip())
+                    return
             
-            # Update conversation history
-            if use_history:
-                self.conversation_history.append({"role": "user", "content": prompt})
-                self.conversation_history.append({"role": "assistant", "content": generated_text})
+            chunks = []
+            with self._lock:
+                # llama.cpp only evaluates the part of the prompt after the
+                # longest prefix already in its context
+                reused = Llama.longest_token_prefix(self._evaluated_tokens, prompt_tokens)
+                self.logger.debug(f"Reusing at least {reused}/{len(prompt_tokens)} prompt tokens from the KV cache")
+                self._evaluated_tokens = prompt_tokens
                 
-                # Limit history size
-                max_history = 10
-                if len(self.conversation_history) > max_history * 2:
-                    self.conversation_history = self.conversation_history[-(max_history * 2):]
+                for chunk in self.model(prompt_tokens, stream=True, **self._sampling_params()):
+                    text = chunk['choices'][0]['text']
+                    if not chunks:
+                        # Match the stripped output of generate_response
+                        text = text.lstrip()
+                        if not text:
+                            continue
+                    chunks.append(text)
+                    yield text
+            
+            response = "".join(chunks)
+            if cache_key is not None and response:
+                with self._lock:
+                    self._completions[cache_key] = response
+                    while len(self._completions) > self.config.get('response_cache_size', 256):
+                        self._completions.popitem(last=False)
             
-            return generated_text
+            # Only record complete responses in the history
+            if use_history and record:
+                self._update_history(prompt, response.strip())
             
         except Exception as e:
             self.logger.error(f"Error generating response: {e}")
-            return f"Error generating response: {str(e)}"
+            yield f"Error generating response: {str(e)}"
     
-    def _build_prompt(self, user_input: str, use_history: bool) -> str:
+    def _completion_key(self, prompt_tokens: List[int]) -> Optional[bytes]:
         """
-        Build the complete prompt with system message and history
+        Get the response cache key for a prompt
         
         Args:
-            user_input: Current user input
-            use_history: Whether to include conversation history
+            prompt_tokens: Token ids of the full prompt
             
         Returns:
-            str: Complete formatted prompt
+            Digest of the prompt, or None if the completion should not be cached
         """
-        prompt_parts = [f"System: {self.system_prompt}\n"]
+        if not self.config.get('response_cache', False):
+            return None
         
-        if use_history and self.conversation_history:
-            for msg in self.conversation_history[-6:]:  # Last 3 exchanges
-                role = "User" if msg["role"] == "user" else "Assistant"
-                prompt_parts.append(f"{role}: {msg['content']}\n")
+        if self.config.get('temperature', 0.7) > _CACHEABLE_TEMPERATURE:
+            return None
         
-        prompt_parts.append(f"User: {user_input}\nAssistant:")
+        return hashlib.blake2b(array('i', prompt_tokens).tobytes(), digest_size=16).digest()
+    
+    def _sampling_params(self) -> Dict:
+        """
+        Get generation parameters from configuration
         
-        return "\n".join(prompt_parts)
+        Returns:
+            Dictionary of keyword arguments for the model call
+        """
+        return {
+            'max_tokens': self.config.get('max_tokens', 512),
+            'temperature': self.config.get('temperature', 0.7),
+            'top_p': self.config.get('top_p', 0.95),
+            'repeat_penalty': self.config.get('repeat_penalty', 1.1),
+            'stop': ["User:", "Human:", "\n\n\n"]
+        }
+    
+    def _update_history(self, prompt: str, generated_text: str):
+        """
+        Append an exchange to the conversation history
+        
+        Args:
+            prompt: User input text
+            generated_text: Generated response
+        """
+        # The bounded deques drop the oldest messages as new ones arrive
+        dropped = max(0, len(self.conversation_history) + 2 - _MAX_HISTORY_MESSAGES)
+        
+        for msg in ({"role": "user", "content": prompt},
+                    {"role": "assistant", "content": generated_text}):
+            self.conversation_history.append(msg)
+            # Tokenize each message once; later prompts reuse the ids
+            self._history_tokens.append(self._tokenize(self._message_text(msg)))
+        
+        self._window_start = max(0, self._window_start - dropped)
+        self._window_tokens = None
+        
+        # Let the prompt window grow to twice its size before cutting it back,
+        # so the model always sees at least `window` messages and the history
+        # prefix (and its KV cache) stays unchanged between cuts
+        window = max(2, self.config.get('history_window', 6) & ~1)
+        if len(self.conversation_history) - self._window_start > 2 * window:
+            self._window_start = len(self.conversation_history) - window
+    
+    def add_exchange(self, prompt: str, response: str):
+        """
+        Record an exchange that was answered without calling the model
+        
+        Args:
+            prompt: User input text
+            response: Response shown to the user
+        """
+        self._update_history(prompt, response.strip())
+    
+    @staticmethod
+    def _message_text(msg: Dict[str, str]) -> str:
+        """Lay out a history message the way the current turn is laid out"""
+        if msg["role"] == "user":
+            return f"User: {msg['content']}\n"
+        return f"Assistant: {msg['content']}\n\n"
+    
+    def _tokenize(self, text: str, add_bos: bool = False) -> List[int]:
+        """
+        Tokenize a piece of prompt text
+        
+        Args:
+            text: Text to tokenize
+            add_bos: Whether to prepend the beginning-of-sequence token
+            
+        Returns:
+            List of token ids
+        """
+        return self.model.tokenize(text.encode('utf-8'), add_bos=add_bos, special=True)
+    
+    def _get_prefix_tokens(self, system: Optional[str] = None) -> List[int]:
+        """
+        Get the cached token ids of the static prompt prefix
+        
+        Args:
+            system: Optional static instruction placed after the system prompt
+            
+        Returns:
+            List of token ids, starting with the beginning-of-sequence token
+        """
+        prefix = self._prefix_tokens.get(system)
+        if prefix is None:
+            text = f"System: {self.system_prompt}\n\n"
+            if system:
+                text += f"System: {system}\n\n"
+            prefix = self._prefix_tokens[system] = self._tokenize(text, add_bos=True)
+        return prefix
+    
+    def _build_prompt_tokens(self, user_input: str, use_history: bool,
+                             system: Optional[str] = None) -> List[int]:
+        """
+        Build the complete prompt with system message and history as tokens
+        
+        Static text comes first so consecutive prompts share the longest
+        possible prefix and llama.cpp can reuse its KV cache for it. Past
+        exchanges are laid out exactly like the current turn, so the next
+        prompt extends the text just evaluated rather than diverging at
+        the last exchange. The static prefix and the history window are
+        tokenized and joined once, so each turn only tokenizes the new
+        user input and concatenates three lists.
+        
+        Args:
+            user_input: Current user input
+            use_history: Whether to include conversation history
+            system: Optional static instruction placed after the system prompt
+            
+        Returns:
+            List of prompt token ids
+        """
+        history = []
+        if use_history:
+            if self._window_tokens is None:
+                self._window_tokens = list(itertools.chain.from_iterable(
+                    itertools.islice(self._history_tokens, self._window_start, None)))
+            history = self._window_tokens
+        
+        return self._get_prefix_tokens(system) + history + self._tokenize(f"User: {user_input}\nAssistant:")
     
     def clear_history(self):
         """Clear the conversation history"""
         self.conversation_history.clear()
+        self._history_tokens.clear()
+        self._window_tokens = None
+        self._window_start = 0
         self.logger.info("Conversation history cleared")
     
+    def reset_state(self):
+        """Clear the conversation history and the model's evaluated context"""
+        self.clear_history()
+        
+        if self.model:
+            with self._lock:
+                self.model.reset()
+                self._evaluated_tokens = []
+            self.logger.info("Model context reset")
+    
     def set_system_prompt(self, prompt: str):
         """
         Update the system prompt
@@ -148,6 +740,7 @@ Be concise, helpful, and friendly in your responses."""
             prompt: New system prompt
         """
         self.system_prompt = prompt
+        self._prefix_tokens.clear()
         self.logger.info("System prompt updated")
     
     def get_conversation_history(self) -> List[Dict[str, str]]:
@@ -157,14 +750,16 @@ Be concise, helpful, and friendly in your responses."""
         Returns:
             List of conversation messages
         """
-        return self.conversation_history.copy()
+        return list(self.conversation_history)
     
     def unload_model(self):
         """Unload the model and free resources"""
-        if self.model:
-            del self.model
-            self.model = None
-            self.logger.info("Model unloaded")
+        # Waits for any generation still holding the context to finish
+        with self._lock:
+            if self.model:
+                del self.model
+                self.model = None
+                self.logger.info("Model unloaded")
 
 
 # Example usage
@@ -181,9 +776,12 @@ if __name__ == "__main__":
     if llm.load_model():
         print("Model loaded successfully!")
         
-        # Test generation
-        response = llm.generate_response("Hello! What can you help me with?")
-        print(f"Response: {response}")
+        # Test generation, printing tokens as they arrive
+        sys.stdout.write("Response: ")
+        for chunk in llm.generate_response_stream("Hello! What can you help me with?"):
+            sys.stdout.write(chunk)
+            sys.stdout.flush()
+        sys.stdout.write("\n")
         
         # Clean up
         llm.unload_model()
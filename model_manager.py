@@ -3,9 +3,13 @@ Model Manager - Helper script for managing LLM models
 """
 
 import json
+import os
 from pathlib import Path
 import sys
 
+# Parsed config.json, read once per run
+_config_cache = None
+
 def print_header(text):
     print("\n" + "="*60)
     print(f"  {text}")
@@ -21,27 +25,35 @@ def list_models():
         print("✓ Created models/ directory")
         return []
     
-    model_files = list(models_dir.glob("*.gguf"))
+    # One directory pass; scandir entries carry the stat info we need
+    with os.scandir(models_dir) as entries:
+        models = [(Path(entry.path), entry.stat().st_size) for entry in entries
+                  if entry.name.endswith(".gguf") and entry.is_file()]
     
-    if not model_files:
+    if not models:
         print("\nNo GGUF models found in models/ directory")
         return []
     
     print("\nAvailable models:")
-    for i, model_path in enumerate(model_files, 1):
-        size_mb = model_path.stat().st_size / (1024 * 1024)
+    for i, (model_path, size) in enumerate(models, 1):
+        size_mb = size / (1024 * 1024)
         print(f"  {i}. {model_path.name}")
         print(f"     Size: {size_mb:.1f} MB")
     
-    return model_files
+    return [model_path for model_path, _ in models]
+
+def load_config():
+    """Read config.json, parsing it only on first use"""
+    global _config_cache
+    if _config_cache is None:
+        with open("config.json", 'r') as f:
+            _config_cache = json.load(f)
+    return _config_cache
 
 def get_current_model():
     """Get currently configured model"""
     try:
-        with open("config.json", 'r') as f:
-            config = json.load(f)
-        
-        current_path = config["llm"]["model_path"]
+        current_path = load_config()["llm"]["model_path"]
         return current_path
     except:
         return None
@@ -49,8 +61,10 @@ def get_current_model():
 def set_model(model_path):
     """Update config.json with new model path"""
     try:
-        with open("config.json", 'r') as f:
-            config = json.load(f)
+        config = load_config()
+        
+        if config["llm"]["model_path"] == str(model_path):
+            return True
         
         config["llm"]["model_path"] = str(model_path)
         
@@ -82,11 +96,14 @@ def recommend_settings(model_size_mb):
         # Very large model (> 6GB)
         print("  n_gpu_layers: 10-20 (limited GPU)")
         print("  n_ctx: 2048 (reduced context)")
+        print("  kv_type_k / kv_type_v: q4_0 (smaller KV cache)")
+        print("  override_tensor: \"[2-9][0-9]\\.ffn_.*_exps\\.=CPU\" (MoE models: keep later experts on CPU)")
     
     print("\nNote: Adjust based on your GPU memory:")
     print("  • 4GB GPU: n_gpu_layers = 20-25")
     print("  • 6GB GPU: n_gpu_layers = 30-35")
     print("  • 8GB+ GPU: n_gpu_layers = 35+")
+    print("  • Or set n_gpu_layers to \"auto\" to fit the free VRAM at load time")
 
 def main():
     print_header("Model Manager")
@@ -0,0 +1,198 @@
+"""
+ResponseCache - Semantic cache for assistant responses
+Serves repeated or near-identical questions without an LLM call
+"""
+
+import logging
+from typing import Dict, Optional
+from collections import OrderedDict, deque
+import threading
+import time
+import re
+
+try:
+    import hnswlib
+    from sentence_transformers import SentenceTransformer
+    SEMANTIC_AVAILABLE = True
+except ImportError:
+    # Exact matching on normalized text is used instead
+    SEMANTIC_AVAILABLE = False
+
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+class ResponseCache:
+    """
+    Response cache keyed by embedding similarity of the user input
+    Uses an HNSW index over sentence embeddings, or exact matching on
+    normalized text when the embedding libraries are unavailable
+    """
+    
+    def __init__(self, config: Dict):
+        """
+        Initialize response cache with configuration
+        
+        Args:
+            config: Dictionary containing cache configuration parameters
+        """
+        self.config = config
+        self.enabled = config.get('enabled', True)
+        self.threshold = config.get('threshold', 0.9)
+        self.max_entries = config.get('max_entries', 1000)
+        self.ttl = config.get('ttl', 600)
+        
+        self.encoder = None
+        self.index = None
+        self._semantic_failed = False
+        self._store: Dict[int, tuple] = {}
+        self._ids = deque()
+        self._next_id = 0
+        self._exact: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        
+        self.logger = logging.getLogger(__name__)
+    
+    def _ensure_index(self) -> bool:
+        """
+        Lazily load the sentence encoder and create the HNSW index
+        
+        Returns:
+            bool: True if semantic matching is available
+        """
+        if self.index is not None:
+            return True
+        
+        if not SEMANTIC_AVAILABLE or self._semantic_failed:
+            return False
+        
+        try:
+            model_name = self.config.get('embedding_model', 'all-MiniLM-L6-v2')
+            self.logger.info(f"Loading embedding model: {model_name}")
+            self.encoder = SentenceTransformer(model_name)
+            
+            index = hnswlib.Index(space='cosine', dim=self.encoder.get_sentence_embedding_dimension())
+            index.init_index(max_elements=self.max_entries, allow_replace_deleted=True)
+            self.index = index
+            return True
+        
+        except Exception as e:
+            self.logger.error(f"Failed to initialize semantic cache, using exact matching: {e}")
+            self._semantic_failed = True
+            return False
+    
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """Normalize text for exact-match lookups"""
+        return _WHITESPACE_RE.sub(' ', text.lower()).strip()
+    
+    def get(self, text: str) -> Optional[str]:
+        """
+        Look up a cached response for the given input
+        
+        Args:
+            text: User input text
+        
+        Returns:
+            str: Cached response, or None on a miss
+        """
+        if not self.enabled:
+            return None
+        
+        with self._lock:
+            response = self._lookup(text)
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return response
+    
+    def _lookup(self, text: str) -> Optional[str]:
+        """Find a live cached response; caller must hold the lock"""
+        now = time.monotonic()
+        
+        if not self._ensure_index():
+            entry = self._exact.get(self._normalize(text))
+            if entry and now - entry[1] < self.ttl:
+                return entry[0]
+            return None
+        
+        if not self._store:
+            return None
+        
+        embedding = self.encoder.encode([text], normalize_embeddings=True)
+        labels, distances = self.index.knn_query(embedding, k=1)
+        
+        # Cosine distance is 1 - similarity
+        if 1.0 - distances[0][0] < self.threshold:
+            return None
+        
+        entry = self._store.get(int(labels[0][0]))
+        if entry and now - entry[1] < self.ttl:
+            return entry[0]
+        return None
+    
+    def put(self, text: str, response: str):
+        """
+        Store a response for the given input
+        
+        Args:
+            text: User input text
+            response: Assistant response
+        """
+        if not self.enabled or not response:
+            return
+        
+        now = time.monotonic()
+        
+        with self._lock:
+            if not self._ensure_index():
+                key = self._normalize(text)
+                self._exact[key] = (response, now)
+                self._exact.move_to_end(key)
+                while len(self._exact) > self.max_entries:
+                    self._exact.popitem(last=False)
+                return
+            
+            # Evict the oldest entry once the index is full
+            if len(self._ids) >= self.max_entries:
+                oldest = self._ids.popleft()
+                self.index.mark_deleted(oldest)
+                self._store.pop(oldest, None)
+            
+            entry_id = self._next_id
+            self._next_id += 1
+            
+            embedding = self.encoder.encode([text], normalize_embeddings=True)
+            self.index.add_items(embedding, [entry_id], replace_deleted=True)
+            self._store[entry_id] = (response, now)
+            self._ids.append(entry_id)
+    
+    def get_stats(self) -> Dict:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with hit/miss counts and current size
+        """
+        with self._lock:
+            size = len(self._store) if self.index is not None else len(self._exact)
+            return {
+                'response_cache_hits': self.hits,
+                'response_cache_misses': self.misses,
+                'response_cache_size': f"{size}/{self.max_entries}"
+            }
+    
+    def clear(self):
+        """Remove all cached responses"""
+        with self._lock:
+            if self.index is not None:
+                for entry_id in self._ids:
+                    self.index.mark_deleted(entry_id)
+            self._ids.clear()
+            self._store.clear()
+            self._exact.clear()
+        
+        self.logger.info("Response cache cleared")
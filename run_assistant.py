@@ -4,6 +4,9 @@ Allows user to choose between text and voice modes
 """
 
 import logging
+import logging.handlers
+import atexit
+import queue
 import json
 import sys
 from pathlib import Path
@@ -11,8 +14,6 @@ from pathlib import Path
 # Add current directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from assistant_core import AssistantCore
-
 
 def choose_mode():
     """Let user choose interaction mode"""
@@ -40,17 +41,25 @@ def choose_mode():
 def main():
     """Main function for interactive launcher"""
     
-    # Configure logging
+    # Configure logging; records are formatted by the QueueHandler and
+    # written to file/console on the listener thread, off the hot path
+    log_queue = queue.SimpleQueue()
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('assistant.log'),
-            logging.StreamHandler()
-        ]
+        handlers=[logging.handlers.QueueHandler(log_queue)]
+    )
+    
+    listener = logging.handlers.QueueListener(
+        log_queue,
+        logging.FileHandler('assistant.log', delay=True),
+        logging.StreamHandler()
     )
+    listener.start()
+    atexit.register(listener.stop)
     
     logger = logging.getLogger(__name__)
+    assistant = None
     
     try:
         # Choose mode
@@ -75,6 +84,9 @@ def main():
         # Set mode
         config['assistant']['mode'] = mode
         
+        # Imported only after mode selection so the menu appears instantly
+        from assistant_core import AssistantCore
+        
         print("\n" + "="*60)
         print(f"  AI Assistant - Initializing ({mode.upper()} mode)...")
         print("="*60)
@@ -109,12 +121,14 @@ def main():
         print(f"\nError: {e}")
     
     finally:
-        # Cleanup
-        try:
-            assistant.shutdown()
+        # Cleanup; a partly initialized assistant still releases the
+        # modules it did start
+        if assistant is not None:
+            try:
+                assistant.shutdown()
+            except Exception as e:
+                logger.error(f"Error during shutdown: {e}")
             print("\nGoodbye!")
-        except:
-            pass
 
 
 if __name__ == "__main__":
@@ -53,7 +53,7 @@ if ($LASTEXITCODE -eq 0) {
     $response = Read-Host
     if ($response -eq 'y' -or $response -eq 'Y') {
         Write-Host "Installing GPU-accelerated version..." -ForegroundColor Yellow
-        $env:CMAKE_ARGS = "-DLLAMA_CUBLAS=on"
+        $env:CMAKE_ARGS = "-DGGML_CUDA=on -DGGML_CUDA_FA_ALL_QUANTS=on"
         pip install llama-cpp-python --force-reinstall --no-cache-dir
         if ($LASTEXITCODE -eq 0) {
             Write-Host "✓ GPU-accelerated llama-cpp-python installed" -ForegroundColor Green
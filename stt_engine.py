@@ -6,6 +6,7 @@ Converts speech input to text for processing
 import logging
 from typing import Dict, Optional
 import threading
+import queue
 import time
 
 try:
@@ -15,6 +16,43 @@ except ImportError:
     SR_AVAILABLE = False
     logging.warning("speech_recognition not installed. STT features will be limited.")
 
+try:
+    import ctranslate2
+    import numpy as np
+    from faster_whisper import WhisperModel
+    FASTER_WHISPER_AVAILABLE = True
+except ImportError:
+    # The whisper engine then uses speech_recognition's PyTorch Whisper
+    FASTER_WHISPER_AVAILABLE = False
+
+try:
+    import webrtcvad
+    VAD_AVAILABLE = True
+except ImportError:
+    # Clips are then passed to the recognizer untrimmed
+    VAD_AVAILABLE = False
+
+
+# webrtcvad works on 16-bit mono PCM in 10/20/30 ms frames
+_VAD_RATE = 16000
+_VAD_FRAME_BYTES = _VAD_RATE * 30 // 1000 * 2
+# Voiced frames kept around the detected speech (300 ms)
+_VAD_PADDING_FRAMES = 10
+
+
+def _audio_to_np(audio):
+    """
+    Convert captured audio to the float32 16 kHz samples Whisper expects
+    
+    Args:
+        audio: Audio data from microphone
+        
+    Returns:
+        NumPy array of samples in [-1, 1)
+    """
+    raw = audio.get_raw_data(convert_rate=_VAD_RATE, convert_width=2)
+    return np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+
 
 class SpeechToText:
     """
@@ -32,8 +70,21 @@ class SpeechToText:
         self.config = config
         self.recognizer = None
         self.microphone = None
+        self.whisper_model = None
+        self.vad = None
         self.is_listening = False
         
+        # Microphone stream held open for a voice session, see enter_session
+        self._mic_source = None
+        
+        # Captured audio waiting for recognition, as (audio, result callback)
+        self.audio_queue = queue.Queue(maxsize=config.get('max_pending', 4))
+        # Longest wait for a queue slot or a transcript before giving up,
+        # so a stopped worker cannot hang the voice loop
+        self.recognition_timeout = config.get('recognition_timeout', 60)
+        self.recognition_thread = None
+        self.running = False
+        
         self.logger = logging.getLogger(__name__)
         
     def initialize(self) -> bool:
@@ -63,6 +114,17 @@ class SpeechToText:
                 self.logger.info("Calibrating for ambient noise... Please wait.")
                 self.recognizer.adjust_for_ambient_noise(source, duration=1)
             
+            if self.config.get('vad', True) and VAD_AVAILABLE:
+                self.vad = webrtcvad.Vad(self.config.get('vad_mode', 2))
+            
+            if self.config.get('engine', 'whisper') == 'whisper' and FASTER_WHISPER_AVAILABLE:
+                self._load_faster_whisper()
+            
+            # Start recognition worker thread so capture never waits on decoding
+            self.running = True
+            self.recognition_thread = threading.Thread(target=self._recognition_worker, daemon=True)
+            self.recognition_thread.start()
+            
             self.logger.info("STT engine initialized successfully")
             return True
             
@@ -70,6 +132,48 @@ class SpeechToText:
             self.logger.error(f"Failed to initialize STT: {e}")
             return False
     
+    def _load_faster_whisper(self):
+        """Load the quantized CTranslate2 Whisper model"""
+        try:
+            device = self.config.get('device')
+            if device is None:
+                device = 'cuda' if ctranslate2.get_cuda_device_count() > 0 else 'cpu'
+            compute_type = self.config.get('compute_type',
+                                           'int8_float16' if device == 'cuda' else 'int8')
+            
+            self.whisper_model = WhisperModel(self.config.get('model', 'base'),
+                                              device=device, compute_type=compute_type)
+            self.logger.info(f"faster-whisper loaded on {device} ({compute_type})")
+            
+        except Exception as e:
+            self.logger.warning(f"Failed to load faster-whisper, using Whisper: {e}")
+            self.whisper_model = None
+    
+    def enter_session(self):
+        """
+        Open the microphone stream for a run of listen() calls
+        Avoids reopening the audio device on every turn
+        """
+        if not self.microphone or self._mic_source is not None:
+            return
+        
+        try:
+            self._mic_source = self.microphone.__enter__()
+        except Exception as e:
+            self.logger.error(f"Failed to open microphone session: {e}")
+            self._mic_source = None
+    
+    def exit_session(self):
+        """Close the microphone stream opened by enter_session"""
+        if self._mic_source is None:
+            return
+        
+        self._mic_source = None
+        try:
+            self.microphone.__exit__(None, None, None)
+        except Exception as e:
+            self.logger.error(f"Error closing microphone session: {e}")
+    
     def listen(self, timeout: Optional[float] = None, phrase_time_limit: Optional[float] = None) -> Optional[str]:
         """
         Listen for speech input and convert to text
@@ -88,21 +192,44 @@ class SpeechToText:
         try:
             self.is_listening = True
             
-            with self.microphone as source:
-                self.logger.info("Listening...")
-                
-                # Listen for audio input
+            self.logger.info("Listening...")
+            
+            # Listen for audio input, reusing the session stream if open
+            if self._mic_source is not None:
                 audio = self.recognizer.listen(
-                    source,
+                    self._mic_source,
                     timeout=timeout,
                     phrase_time_limit=phrase_time_limit
                 )
+            else:
+                with self.microphone as source:
+                    audio = self.recognizer.listen(
+                        source,
+                        timeout=timeout,
+                        phrase_time_limit=phrase_time_limit
+                    )
             
             self.is_listening = False
+            
+            audio = self._trim_silence(audio)
+            if audio is None:
+                self.logger.info("No speech detected")
+                return None
+            
             self.logger.info("Processing speech...")
             
-            # Recognize speech using configured engine
-            text = self._recognize_speech(audio)
+            if not self.running:
+                self.logger.error("Recognition worker is not running")
+                return None
+            
+            # Recognize speech on the worker, behind any queued utterances
+            result = queue.Queue(maxsize=1)
+            try:
+                self.audio_queue.put((audio, result.put), timeout=self.recognition_timeout)
+                text = result.get(timeout=self.recognition_timeout)
+            except (queue.Full, queue.Empty):
+                self.logger.error("Timed out waiting for speech recognition")
+                return None
             
             if text:
                 self.logger.info(f"Recognized: {text}")
@@ -118,6 +245,57 @@ class SpeechToText:
             self.is_listening = False
             return None
     
+    def _trim_silence(self, audio):
+        """
+        Trim leading and trailing silence from captured audio
+        
+        Args:
+            audio: Audio data from microphone
+            
+        Returns:
+            Trimmed audio data, or None if the clip contains too little speech
+        """
+        if not self.vad:
+            return audio
+        
+        try:
+            raw = audio.get_raw_data(convert_rate=_VAD_RATE, convert_width=2)
+            frame_count = len(raw) // _VAD_FRAME_BYTES
+            if frame_count == 0:
+                return audio
+            
+            voiced = [
+                i for i in range(frame_count)
+                if self.vad.is_speech(raw[i * _VAD_FRAME_BYTES:(i + 1) * _VAD_FRAME_BYTES], _VAD_RATE)
+            ]
+            
+            if len(voiced) < frame_count * self.config.get('vad_min_speech', 0.1):
+                return None
+            
+            start = max(0, voiced[0] - _VAD_PADDING_FRAMES) * _VAD_FRAME_BYTES
+            end = min(frame_count, voiced[-1] + 1 + _VAD_PADDING_FRAMES) * _VAD_FRAME_BYTES
+            return sr.AudioData(raw[start:end], _VAD_RATE, 2)
+            
+        except Exception as e:
+            self.logger.error(f"Error running voice activity detection: {e}")
+            return audio
+    
+    def _recognition_worker(self):
+        """Background worker thread for processing captured audio"""
+        while self.running:
+            try:
+                item = self.audio_queue.get(timeout=0.5)
+                if item is None:  # Shutdown signal
+                    break
+                
+                audio, on_result = item
+                on_result(self._recognize_speech(audio))
+                
+            except queue.Empty:
+                continue
+            except Exception as e:
+                self.logger.error(f"Error in recognition worker: {e}")
+    
     def _recognize_speech(self, audio) -> Optional[str]:
         """
         Recognize speech from audio using configured engine
@@ -132,7 +310,22 @@ class SpeechToText:
         language = self.config.get('language', 'en')
         
         try:
-            if engine == 'whisper':
+            if engine == 'whisper' and self.whisper_model:
+                # Use faster-whisper (local, quantized) on raw samples,
+                # skipping the WAV encode/decode round trip
+                segments, _ = self.whisper_model.transcribe(
+                    _audio_to_np(audio),
+                    language=language,
+                    beam_size=1,
+                    vad_filter=True
+                )
+                text = "".join(segment.text for segment in segments).strip()
+                if not text:
+                    self.logger.warning("Could not understand audio")
+                    return None
+                return text
+                
+            elif engine == 'whisper':
                 # Use OpenAI Whisper (local or API)
                 model = self.config.get('model', 'base')
                 return self.recognizer.recognize_whisper(audio, model=model, language=language)
@@ -171,15 +364,25 @@ class SpeechToText:
             self.logger.error("STT engine not initialized")
             return None
         
-        def audio_callback(recognizer, audio):
-            """Process audio in background"""
+        def on_result(text):
+            """Deliver recognized text to the caller"""
             try:
-                text = self._recognize_speech(audio)
                 if text and callback:
                     callback(text)
             except Exception as e:
                 self.logger.error(f"Error in background recognition: {e}")
         
+        def audio_callback(recognizer, audio):
+            """Hand captured audio to the recognition worker"""
+            audio = self._trim_silence(audio)
+            if audio is None:
+                return
+            
+            try:
+                self.audio_queue.put_nowait((audio, on_result))
+            except queue.Full:
+                self.logger.warning("Recognition backlog full, dropping utterance")
+        
         # Start background listening
         stop_listening = self.recognizer.listen_in_background(
             self.microphone,
@@ -238,6 +441,7 @@ class SpeechToText:
             bool: True if successful
         """
         try:
+            self.exit_session()
             self.microphone = sr.Microphone(device_index=device_index)
             
             # Re-calibrate for ambient noise
@@ -254,8 +458,20 @@ class SpeechToText:
     def shutdown(self):
         """Shutdown the STT engine"""
         self.is_listening = False
+        self.running = False
+        self.exit_session()
+        
+        # Signal recognition worker to stop
+        if self.recognition_thread and self.recognition_thread.is_alive():
+            try:
+                self.audio_queue.put_nowait(None)
+            except queue.Full:
+                pass
+            self.recognition_thread.join(timeout=2.0)
+        
         self.recognizer = None
         self.microphone = None
+        self.whisper_model = None
         self.logger.info("STT engine shutdown")
 
 
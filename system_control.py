@@ -4,20 +4,165 @@ Provides controlled access to system operations
 """
 
 import logging
-from typing import Dict, List, Optional, Callable
+from array import array
+import bisect
+from typing import Dict, Iterator, List, Optional, Callable, Sequence, Union
+import codecs
+import concurrent.futures
+import functools
 import os
+import shutil
+import stat
 import subprocess
 import platform
+import threading
+import time
 import psutil
 from pathlib import Path
 
 
+_COMMAND_TIMEOUT = 30
+# Files above this size are read and decoded in chunks, so the raw bytes
+# never sit in memory alongside the whole decoded text
+_STREAM_READ_THRESHOLD = 8 << 20
+_READ_CHUNK = 65536
+# Writes above this size go straight to the fd and are dropped from the
+# page cache afterwards, keeping the model's mmap'ed weights resident
+_LARGE_WRITE = 1 << 20
+# A directory modified this recently may change again within the same
+# mtime tick, so its listing is not cached yet
+_DIR_MTIME_SLACK = 2.0
+_MAX_CACHED_DIRS = 256
+
+
+def _stat_once(path: Path) -> Optional[os.stat_result]:
+    """
+    Stat a path once, for existence and type checks together
+    
+    Args:
+        path: Path to check
+        
+    Returns:
+        Stat result, or None if the path cannot be stat'ed
+    """
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+def _write_large(path: Path, data: bytes):
+    """
+    Write a large file in 1 MB slices without polluting the page cache
+    
+    Args:
+        path: Path to the file
+        data: Encoded content
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view[:_LARGE_WRITE])
+            view = view[written:]
+        
+        if hasattr(os, 'posix_fadvise'):
+            # Pages must be clean before the kernel will drop them
+            os.fdatasync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+def _read_text(path: Path) -> str:
+    """
+    Read a UTF-8 file
+    
+    Args:
+        path: Path to the file
+        
+    Returns:
+        str: File contents
+    """
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        size = os.fstat(fd).st_size
+        if size > _STREAM_READ_THRESHOLD and hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        
+        # Small files arrive in a single read sized from fstat
+        chunk_size = size + 1 if size <= _STREAM_READ_THRESHOLD else _READ_CHUNK
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        chunks = []
+        while True:
+            data = os.read(fd, chunk_size)
+            if not data:
+                break
+            chunks.append(decoder.decode(data))
+        chunks.append(decoder.decode(b'', final=True))
+        
+        return ''.join(chunks)
+    finally:
+        os.close(fd)
+
+
+def _canonical_dir(path) -> str:
+    """Resolve and case-normalize a directory, with a trailing separator"""
+    canonical = os.path.normcase(os.path.realpath(path))
+    return canonical if canonical.endswith(os.sep) else canonical + os.sep
+
+
+def _prefix_free(dirs) -> tuple:
+    """
+    Sort canonical directories, dropping any nested inside another
+    
+    Args:
+        dirs: Canonical directories from _canonical_dir
+        
+    Returns:
+        Sorted tuple in which no entry is a prefix of another
+    """
+    result = []
+    for canonical in sorted(set(dirs)):
+        # Any ancestor in the set sorts immediately before its descendants
+        if not result or not canonical.startswith(result[-1]):
+            result.append(canonical)
+    return tuple(result)
+
+
+@functools.lru_cache(maxsize=4096)
+def _path_within(resolved: str, allowed_dirs: tuple) -> bool:
+    """
+    Check if a resolved path lies inside one of the given directories
+    
+    Args:
+        resolved: Path from _canonical_dir
+        allowed_dirs: Allowed directories from _prefix_free
+        
+    Returns:
+        bool: True if path is allowed
+    """
+    # With no entry a prefix of another, only the greatest entry not
+    # after the path can contain it
+    i = bisect.bisect_right(allowed_dirs, resolved) - 1
+    return i >= 0 and resolved.startswith(allowed_dirs[i])
+
+
 class SystemControl:
     """
     System control interface with safety checks and permissions
     Allows controlled execution of system commands and file operations
     """
     
+    # Executables for well-known application names on Windows
+    _WIN_APP_PATHS = {
+        'notepad': 'notepad.exe',
+        'calculator': 'calc.exe',
+        'explorer': 'explorer.exe',
+        'chrome': r'C:\Program Files\Google\Chrome\Application\chrome.exe',
+        'firefox': r'C:\Program Files\Mozilla Firefox\firefox.exe'
+    }
+    
     def __init__(self, config: Dict):
         """
         Initialize system control with configuration
@@ -27,12 +172,30 @@ class SystemControl:
         """
         self.config = config
         self.allowed_directories = [Path(d) for d in config.get('allowed_directories', [])]
+        self._allowed_resolved = _prefix_free(_canonical_dir(d) for d in self.allowed_directories)
         self.allowed_commands = config.get('allowed_commands', [])
         self.require_confirmation = config.get('require_confirmation', True)
         self.confirmation_callback: Optional[Callable] = None
         
         self.logger = logging.getLogger(__name__)
         self.system = platform.system()
+        self._process_cache: Optional[tuple] = None
+        # Slow psutil readings as name -> (timestamp, value)
+        self._stat_cache: Dict[str, tuple] = {}
+        # Directory listings as path -> (directory mtime_ns, sorted names)
+        self._dir_cache: Dict[str, tuple] = {}
+        
+        # Resolve application executables once rather than on every launch
+        self._app_paths: Dict[str, str] = {}
+        if self.system == "Windows":
+            self._app_paths = {name: shutil.which(path) or path
+                               for name, path in self._WIN_APP_PATHS.items()}
+        
+        # CPU usage is sampled in the background so queries never block on it
+        self._cpu_percent = 0.0
+        self._sampler_stop = threading.Event()
+        self._cpu_sampler_thread = threading.Thread(target=self._cpu_sampler, daemon=True)
+        self._cpu_sampler_thread.start()
     
     def set_confirmation_callback(self, callback: Callable):
         """
@@ -73,16 +236,9 @@ class SystemControl:
         Returns:
             bool: True if path is allowed
         """
-        path = path.resolve()
-        
-        for allowed_dir in self.allowed_directories:
-            try:
-                path.relative_to(allowed_dir)
-                return True
-            except ValueError:
-                continue
-        
-        return False
+        # Resolve on every call: a symlink may have been repointed since the
+        # last check. Only the lookup against the allow-list is cached
+        return _path_within(_canonical_dir(path), self._allowed_resolved)
     
     def open_application(self, app_name: str) -> bool:
         """
@@ -106,17 +262,15 @@ class SystemControl:
         
         try:
             if self.system == "Windows":
-                # Windows-specific application launching
-                app_paths = {
-                    'notepad': 'notepad.exe',
-                    'calculator': 'calc.exe',
-                    'explorer': 'explorer.exe',
-                    'chrome': r'C:\Program Files\Google\Chrome\Application\chrome.exe',
-                    'firefox': r'C:\Program Files\Mozilla Firefox\firefox.exe'
-                }
-                
-                cmd = app_paths.get(app_name.lower(), app_name)
-                subprocess.Popen(cmd, shell=True)
+                # Executables start directly, without a cmd.exe in between
+                # (and no shell parsing of the name)
+                cmd = self._app_paths.get(app_name.lower()) or shutil.which(app_name)
+                if cmd and cmd.lower().endswith(('.exe', '.com')):
+                    subprocess.Popen([cmd])
+                else:
+                    # CreateProcess resolves neither .cmd/.bat shims nor
+                    # App Paths registrations; ShellExecute does
+                    os.startfile(cmd or app_name)
                 
             elif self.system == "Darwin":  # macOS
                 subprocess.Popen(['open', '-a', app_name])
@@ -149,13 +303,13 @@ class SystemControl:
             return None
         
         # Check if file exists
-        if not path.exists() or not path.is_file():
+        st = _stat_once(path)
+        if st is None or not stat.S_ISREG(st.st_mode):
             self.logger.warning(f"File not found: {filepath}")
             return None
         
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = _read_text(path)
             
             self.logger.info(f"Read file: {filepath}")
             return content
@@ -164,6 +318,40 @@ class SystemControl:
             self.logger.error(f"Error reading file: {e}")
             return None
     
+    def read_file_stream(self, filepath: str) -> Iterator[str]:
+        """
+        Read a file line by line without loading it whole
+        
+        Args:
+            filepath: Path to the file
+            
+        Yields:
+            str: Lines of the file, including line endings
+        """
+        path = Path(filepath)
+        
+        # Check if path is allowed
+        if not self._is_path_allowed(path):
+            self.logger.warning(f"Access denied to path: {filepath}")
+            return
+        
+        # Check if file exists
+        st = _stat_once(path)
+        if st is None or not stat.S_ISREG(st.st_mode):
+            self.logger.warning(f"File not found: {filepath}")
+            return
+        
+        try:
+            with open(path, 'r', encoding='utf-8', newline='', buffering=131072) as f:
+                if hasattr(os, 'posix_fadvise'):
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                yield from f
+            
+            self.logger.info(f"Read file: {filepath}")
+            
+        except Exception as e:
+            self.logger.error(f"Error reading file: {e}")
+    
     def write_file(self, filepath: str, content: str) -> bool:
         """
         Write content to a file
@@ -187,29 +375,99 @@ class SystemControl:
             self.logger.info("Action cancelled by user")
             return False
         
+        return self._write_path(path, content)
+    
+    def _write_path(self, path: Path, content: str) -> bool:
+        """
+        Write content to an already permitted and confirmed path
+        
+        Args:
+            path: Path to the file
+            content: Content to write
+            
+        Returns:
+            bool: True if successful
+        """
         try:
             # Create parent directory if needed
             path.parent.mkdir(parents=True, exist_ok=True)
             
-            with open(path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            data = content.encode('utf-8')
+            if len(data) > _LARGE_WRITE:
+                _write_large(path, data)
+            else:
+                path.write_bytes(data)
             
-            self.logger.info(f"Wrote file: {filepath}")
+            self.logger.info(f"Wrote file: {path}")
             return True
             
         except Exception as e:
             self.logger.error(f"Error writing file: {e}")
             return False
     
-    def list_directory(self, dirpath: str) -> Optional[List[str]]:
+    def read_batch(self, filepaths: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Read several files concurrently
+        
+        Args:
+            filepaths: Paths of the files
+            
+        Returns:
+            Dictionary mapping each path to its contents, or None if failed
+        """
+        if not filepaths:
+            return {}
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(filepaths), 8)) as executor:
+            return dict(zip(filepaths, executor.map(self.read_file, filepaths)))
+    
+    def write_batch(self, items: Dict[str, str]) -> Dict[str, bool]:
+        """
+        Write several files concurrently after a single confirmation
+        
+        Args:
+            items: Dictionary mapping file paths to content
+            
+        Returns:
+            Dictionary mapping each path to True if it was written
+        """
+        results = {filepath: False for filepath in items}
+        
+        allowed = {}
+        for filepath, content in items.items():
+            path = Path(filepath)
+            if self._is_path_allowed(path):
+                allowed[filepath] = (path, content)
+            else:
+                self.logger.warning(f"Access denied to path: {filepath}")
+        
+        if not allowed:
+            return results
+        
+        # Confirm action
+        if not self._check_confirmation(f"Write to {len(allowed)} files: {', '.join(allowed)}"):
+            self.logger.info("Action cancelled by user")
+            return results
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(allowed), 8)) as executor:
+            futures = {filepath: executor.submit(self._write_path, path, content)
+                       for filepath, (path, content) in allowed.items()}
+        
+        for filepath, future in futures.items():
+            results[filepath] = future.result()
+        
+        return results
+    
+    def list_directory(self, dirpath: str, details: bool = False) -> Optional[List[Union[str, Dict]]]:
         """
         List contents of a directory
         
         Args:
             dirpath: Path to the directory
+            details: Whether to include type, size and modification time
             
         Returns:
-            List of file/folder names, or None if failed
+            List of file/folder names (or detail dictionaries), or None if failed
         """
         path = Path(dirpath)
         
@@ -219,19 +477,96 @@ class SystemControl:
             return None
         
         # Check if directory exists
-        if not path.exists() or not path.is_dir():
+        st = _stat_once(path)
+        if st is None or not stat.S_ISDIR(st.st_mode):
             self.logger.warning(f"Directory not found: {dirpath}")
             return None
         
+        # Creating, deleting or renaming an entry bumps the directory's
+        # mtime, so an unchanged mtime means the cached names are current
+        key = os.path.abspath(path)
+        cached = self._dir_cache.get(key)
+        if not details and cached and cached[0] == st.st_mtime_ns:
+            return list(cached[1])
+        
         try:
-            items = [item.name for item in path.iterdir()]
+            # scandir gets names and types from one directory read
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+            
             self.logger.info(f"Listed directory: {dirpath}")
-            return sorted(items)
+            
+            names = [entry.name for entry in entries]
+            if time.time() - st.st_mtime > _DIR_MTIME_SLACK:
+                if key not in self._dir_cache and len(self._dir_cache) >= _MAX_CACHED_DIRS:
+                    self._dir_cache.pop(next(iter(self._dir_cache)), None)
+                self._dir_cache[key] = (st.st_mtime_ns, tuple(names))
+            
+            if not details:
+                return names
+            
+            # Per-entry stats are latency bound on network drives, so overlap them
+            workers = min(32, (os.cpu_count() or 1) * 4)
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(self._entry_details, entries))
             
         except Exception as e:
             self.logger.error(f"Error listing directory: {e}")
             return None
     
+    @staticmethod
+    def _entry_details(entry: os.DirEntry) -> Dict:
+        """
+        Get type, size and modification time of a directory entry
+        
+        Args:
+            entry: Entry from os.scandir
+            
+        Returns:
+            Dictionary with entry details
+        """
+        try:
+            st = entry.stat()
+            return {
+                'name': entry.name,
+                'is_dir': entry.is_dir(),
+                'size': st.st_size,
+                'modified': st.st_mtime
+            }
+        except OSError:
+            return {'name': entry.name, 'is_dir': entry.is_dir(), 'size': None, 'modified': None}
+    
+    def _cpu_sampler(self):
+        """Background thread sampling CPU usage every 500 ms"""
+        try:
+            # The first call only sets the baseline for the next one
+            psutil.cpu_percent(interval=None)
+            while not self._sampler_stop.wait(0.5):
+                self._cpu_percent = psutil.cpu_percent(interval=None)
+        except Exception as e:
+            self.logger.error(f"Error sampling CPU usage: {e}")
+    
+    def _cached_stat(self, name: str, ttl: float, func: Callable):
+        """
+        Get a psutil reading, reusing it for a short time
+        
+        Args:
+            name: Cache key
+            ttl: Seconds the reading stays valid
+            func: Function taking the reading
+            
+        Returns:
+            The cached or fresh reading
+        """
+        now = time.monotonic()
+        entry = self._stat_cache.get(name)
+        if entry and now - entry[0] < ttl:
+            return entry[1]
+        
+        value = func()
+        self._stat_cache[name] = (now, value)
+        return value
+    
     def get_system_info(self) -> Dict:
         """
         Get system information
@@ -240,18 +575,22 @@ class SystemControl:
             Dictionary with system information
         """
         try:
+            uname = platform.uname()
+            memory = self._cached_stat('memory', 0.25, psutil.virtual_memory)
+            disk = self._cached_stat('disk', 5.0, lambda: psutil.disk_usage('/'))
+            
             info = {
-                'system': platform.system(),
-                'release': platform.release(),
-                'version': platform.version(),
-                'machine': platform.machine(),
-                'processor': platform.processor(),
+                'system': uname.system,
+                'release': uname.release,
+                'version': uname.version,
+                'machine': uname.machine,
+                'processor': uname.processor,
                 'cpu_count': psutil.cpu_count(),
-                'cpu_percent': psutil.cpu_percent(interval=1),
-                'memory_total': f"{psutil.virtual_memory().total / (1024**3):.2f} GB",
-                'memory_available': f"{psutil.virtual_memory().available / (1024**3):.2f} GB",
-                'memory_percent': psutil.virtual_memory().percent,
-                'disk_usage': f"{psutil.disk_usage('/').percent}%"
+                'cpu_percent': self._cpu_percent,
+                'memory_total': f"{memory.total / (1024**3):.2f} GB",
+                'memory_available': f"{memory.available / (1024**3):.2f} GB",
+                'memory_percent': memory.percent,
+                'disk_usage': f"{disk.percent}%"
             }
             
             return info
@@ -281,7 +620,7 @@ class SystemControl:
                 shell=True,
                 capture_output=True,
                 text=True,
-                timeout=30
+                timeout=_COMMAND_TIMEOUT
             )
             
             output = result.stdout if result.returncode == 0 else result.stderr
@@ -295,30 +634,47 @@ class SystemControl:
             self.logger.error(f"Error executing command: {e}")
             return None
     
-    def get_running_processes(self) -> List[Dict]:
+    def get_running_processes(self) -> Dict[str, Sequence]:
         """
-        Get list of running processes
+        Get running processes as parallel columns
+        Results are reused for process_cache_ttl seconds
         
         Returns:
-            List of process information dictionaries
+            Dictionary of pid, name, cpu_percent and memory_percent columns
         """
+        now = time.monotonic()
+        if self._process_cache and now - self._process_cache[0] < self.config.get('process_cache_ttl', 1.0):
+            return self._process_cache[1]
+        
+        processes = {
+            'pid': array('i'),
+            'name': [],
+            'cpu_percent': array('f'),
+            'memory_percent': array('f')
+        }
+        
         try:
-            processes = []
-            
-            for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
-                try:
-                    processes.append(proc.info)
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    pass
-            
-            return processes
+            # process_iter fetches the requested attributes under oneshot(),
+            # so each process's /proc files are read once
+            for proc in psutil.process_iter(['name', 'cpu_percent', 'memory_percent']):
+                info = proc.info
+                processes['pid'].append(proc.pid)
+                processes['name'].append(info['name'] or '')
+                processes['cpu_percent'].append(info['cpu_percent'] or 0.0)
+                processes['memory_percent'].append(info['memory_percent'] or 0.0)
             
         except Exception as e:
             self.logger.error(f"Error getting processes: {e}")
-            return []
+            return {key: column[:0] for key, column in processes.items()}
+        
+        self._process_cache = (now, processes)
+        return processes
     
     def shutdown(self):
         """Cleanup system control resources"""
+        self._sampler_stop.set()
+        self._cpu_sampler_thread.join(timeout=2.0)
+        
         self.logger.info("System control shutdown")
 
 
@@ -4,9 +4,18 @@ Run this to check if all components are properly set up
 """
 
 import sys
+import io
 import json
+import asyncio
+import contextvars
+import multiprocessing
 from pathlib import Path
 
+_config_cache = None
+_gpu_cache = None
+# Buffer collecting the output of the test phase running in this context
+_phase_output = contextvars.ContextVar('phase_output', default=None)
+
 def print_header(text):
     """Print formatted header"""
     print("\n" + "="*60)
@@ -21,7 +30,32 @@ def print_status(status, message):
     
     symbol = symbols.get(status, "?")
     color = colors.get(status, "")
-    print(f"{color}{symbol}{reset} {message}")
+    print(f"{color}{symbol}{reset} {message}", file=_phase_output.get() or sys.stdout)
+
+def _probe(module):
+    """Import a module, returning (module, error message or None)"""
+    try:
+        __import__(module)
+        return module, None
+    except Exception as e:
+        return module, str(e)
+
+def _probe_imports(modules):
+    """Import modules in parallel worker processes"""
+    # Native libraries make some imports take seconds; overlapping them
+    # bounds the wait by the slowest one and keeps this process clean.
+    # Spawned workers start from a fresh interpreter: forked ones would
+    # inherit sys.modules (and import locks held by phase threads)
+    ctx = multiprocessing.get_context('spawn')
+    with ctx.Pool(min(8, len(modules))) as pool:
+        return dict(pool.map(_probe, modules))
+
+def load_config():
+    """Read config.json, parsing it only on first use"""
+    global _config_cache
+    if _config_cache is None:
+        _config_cache = json.loads(Path("config.json").read_bytes())
+    return _config_cache
 
 def test_python_version():
     """Test Python version"""
@@ -44,27 +78,27 @@ def test_dependencies():
         "speech_recognition": "SpeechRecognition"
     }
     
+    # Optional packages
+    optional = {
+        "whisper": "openai-whisper",
+        "pyaudio": "pyaudio"
+    }
+    
+    errors = _probe_imports(list(packages) + list(optional))
+    
     results = []
     for module, package in packages.items():
-        try:
-            __import__(module)
+        if errors[module] is None:
             print_status("pass", f"{package} installed")
             results.append(True)
-        except ImportError:
+        else:
             print_status("fail", f"{package} not installed")
             results.append(False)
     
-    # Optional packages
-    optional = {
-        "whisper": "openai-whisper",
-        "pyaudio": "pyaudio"
-    }
-    
     for module, package in optional.items():
-        try:
-            __import__(module)
+        if errors[module] is None:
             print_status("pass", f"{package} installed (optional)")
-        except ImportError:
+        else:
             print_status("warn", f"{package} not installed (optional)")
     
     return all(results)
@@ -78,8 +112,7 @@ def test_configuration():
         return False
     
     try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
+        config = load_config()
         
         required_sections = ["llm", "tts", "stt", "web", "system", "assistant"]
         missing = [s for s in required_sections if s not in config]
@@ -101,8 +134,7 @@ def test_configuration():
 def test_model_file():
     """Test if model file exists"""
     try:
-        with open("config.json", 'r') as f:
-            config = json.load(f)
+        config = load_config()
         
         model_path = Path(config["llm"]["model_path"])
         
@@ -147,18 +179,41 @@ def test_modules():
         "assistant_core"
     ]
     
+    errors = _probe_imports(modules)
+    
     results = []
     for module in modules:
-        try:
-            __import__(module)
+        if errors[module] is None:
             print_status("pass", f"{module}.py importable")
             results.append(True)
-        except Exception as e:
-            print_status("fail", f"{module}.py error: {e}")
+        else:
+            print_status("fail", f"{module}.py error: {errors[module]}")
             results.append(False)
     
     return all(results)
 
+def detect_gpu():
+    """Check for an NVIDIA GPU, probing only on first use"""
+    global _gpu_cache
+    if _gpu_cache is None:
+        try:
+            import pynvml
+        except ImportError:
+            # Without the NVML bindings, fall back to running nvidia-smi
+            import subprocess
+            result = subprocess.run(['nvidia-smi'], capture_output=True, text=True)
+            _gpu_cache = result.returncode == 0
+        else:
+            try:
+                pynvml.nvmlInit()
+                try:
+                    _gpu_cache = pynvml.nvmlDeviceGetCount() > 0
+                finally:
+                    pynvml.nvmlShutdown()
+            except pynvml.NVMLError:
+                _gpu_cache = False
+    return _gpu_cache
+
 def test_gpu_support():
     """Test GPU availability"""
     try:
@@ -168,9 +223,7 @@ def test_gpu_support():
         
         # Try to detect GPU
         try:
-            import subprocess
-            result = subprocess.run(['nvidia-smi'], capture_output=True, text=True)
-            if result.returncode == 0:
+            if detect_gpu():
                 print_status("pass", "NVIDIA GPU detected")
                 return True
             else:
@@ -184,30 +237,44 @@ def test_gpu_support():
         print_status("fail", "llama-cpp-python not installed")
         return False
 
+async def _run_phase(test):
+    """Run a test phase on a worker thread, capturing its output"""
+    output = io.StringIO()
+    
+    def run():
+        _phase_output.set(output)
+        return test()
+    
+    passed = await asyncio.to_thread(run)
+    return passed, output.getvalue()
+
+async def _run_phases(tests):
+    """Run independent test phases concurrently"""
+    return await asyncio.gather(*(_run_phase(test) for test in tests))
+
 def main():
     """Run all tests"""
     print_header("AI Assistant - Installation Test")
     
-    print("\n[1/7] Testing Python Version...")
-    test1 = test_python_version()
-    
-    print("\n[2/7] Testing Dependencies...")
-    test2 = test_dependencies()
-    
-    print("\n[3/7] Testing Configuration...")
-    test3 = test_configuration()
-    
-    print("\n[4/7] Testing Model File...")
-    test4 = test_model_file()
+    phases = [
+        ("Python Version", test_python_version),
+        ("Dependencies", test_dependencies),
+        ("Configuration", test_configuration),
+        ("Model File", test_model_file),
+        ("Directories", test_directories),
+        ("Core Modules", test_modules),
+        ("GPU Support", test_gpu_support)
+    ]
     
-    print("\n[5/7] Testing Directories...")
-    test5 = test_directories()
+    # The phases are independent, so the run takes as long as the slowest;
+    # output is buffered and printed in order afterwards
+    results = asyncio.run(_run_phases([test for _, test in phases]))
     
-    print("\n[6/7] Testing Core Modules...")
-    test6 = test_modules()
+    for i, ((title, _), (_, output)) in enumerate(zip(phases, results), 1):
+        print(f"\n[{i}/{len(phases)}] Testing {title}...")
+        sys.stdout.write(output)
     
-    print("\n[7/7] Testing GPU Support...")
-    test7 = test_gpu_support()
+    test1, test2, test3, test4, test5, test6, test7 = (passed for passed, _ in results)
     
     # Summary
     print_header("Test Summary")
@@ -4,6 +4,9 @@ Example script for text-only interaction with the AI assistant
 """
 
 import logging
+import logging.handlers
+import atexit
+import queue
 import json
 import sys
 from pathlib import Path
@@ -17,17 +20,25 @@ from assistant_core import AssistantCore
 def main():
     """Main function for text assistant"""
     
-    # Configure logging
+    # Configure logging; records are formatted by the QueueHandler and
+    # written to file/console on the listener thread, off the hot path
+    log_queue = queue.SimpleQueue()
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('assistant.log'),
-            logging.StreamHandler()
-        ]
+        handlers=[logging.handlers.QueueHandler(log_queue)]
     )
     
+    listener = logging.handlers.QueueListener(
+        log_queue,
+        logging.FileHandler('assistant.log', delay=True),
+        logging.StreamHandler()
+    )
+    listener.start()
+    atexit.register(listener.stop)
+    
     logger = logging.getLogger(__name__)
+    assistant = None
     
     try:
         # Load configuration
@@ -70,12 +81,14 @@ def main():
         print(f"\nError: {e}")
     
     finally:
-        # Cleanup
-        try:
-            assistant.shutdown()
+        # Cleanup; a partly initialized assistant still releases the
+        # modules it did start
+        if assistant is not None:
+            try:
+                assistant.shutdown()
+            except Exception as e:
+                logger.error(f"Error during shutdown: {e}")
             print("\nGoodbye!")
-        except:
-            pass
 
 
 if __name__ == "__main__":
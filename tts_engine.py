@@ -4,9 +4,11 @@ Converts text responses to speech output
 """
 
 import logging
-from typing import Dict, Optional
+from typing import Dict, List, Optional
+import asyncio
 import threading
 import queue
+import time
 
 try:
     import pyttsx3
@@ -32,9 +34,28 @@ class TextToSpeech:
         self.config = config
         self.engine = None
         self.is_speaking = False
+        # Pending speech as (text, completion event or None); the worker is
+        # the only thread that drives the engine
         self.speech_queue = queue.Queue()
+        # Utterances queued or being spoken, so is_busy can poll without
+        # taking the queue's mutex
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        # Bumped by stop() so the worker drops speech it already dequeued
+        self._generation = 0
+        # Dequeued utterance that did not fit the previous batch, with the
+        # generation it was dequeued in
+        self._carry = None
         self.speech_thread = None
         self.running = False
+        # Enumerating voices crosses into the driver (COM on SAPI), so the
+        # list is read once
+        self._voices_cache = None
+        
+        # Short utterances queued close together are spoken in one
+        # engine run instead of paying runAndWait's setup for each
+        self.batch_char_limit = config.get('batch_char_limit', 400)
+        self.coalesce_window = config.get('coalesce_window', 0.05)
         
         self.logger = logging.getLogger(__name__)
         
@@ -71,7 +92,7 @@ class TextToSpeech:
             self.engine.setProperty('volume', volume)
             
             # Set voice if specified
-            voices = self.engine.getProperty('voices')
+            voices = self.list_voices()
             if 0 <= voice_id < len(voices):
                 self.engine.setProperty('voice', voices[voice_id].id)
             
@@ -91,23 +112,94 @@ class TextToSpeech:
     def _speech_worker(self):
         """Background worker thread for processing speech queue"""
         while self.running:
+            if self._carry:
+                item, generation = self._carry
+                self._carry = None
+            else:
+                try:
+                    item = self.speech_queue.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                generation = self._generation
+            
+            if item is None:  # Shutdown signal
+                break
+            
+            texts, events = [item[0]], [item[1]]
+            shutting_down = self._coalesce(texts, events)
+            
             try:
-                text = self.speech_queue.get(timeout=0.5)
-                if text is None:  # Shutdown signal
-                    break
-                    
-                self.is_speaking = True
-                self.engine.say(text)
-                self.engine.runAndWait()
-                self.is_speaking = False
-                
-                self.speech_queue.task_done()
+                if generation == self._generation:
+                    self.is_speaking = True
+                    self.engine.say(' '.join(texts))
+                    self.engine.runAndWait()
                 
-            except queue.Empty:
-                continue
             except Exception as e:
                 self.logger.error(f"Error in speech worker: {e}")
+            finally:
                 self.is_speaking = False
+                for done in events:
+                    if done:
+                        done.set()
+                    self._release_pending()
+                    self.speech_queue.task_done()
+            
+            if shutting_down:
+                break
+    
+    def _coalesce(self, texts: List[str], events: List) -> bool:
+        """
+        Pull utterances queued within the coalescing window into one batch
+        
+        Args:
+            texts: Batch texts, extended in place
+            events: Completion events of the batch, extended in place
+            
+        Returns:
+            bool: True if the shutdown signal was dequeued
+        """
+        deadline = time.monotonic() + self.coalesce_window
+        length = len(texts[0])
+        
+        while length < self.batch_char_limit:
+            timeout = deadline - time.monotonic()
+            try:
+                if timeout > 0:
+                    item = self.speech_queue.get(timeout=timeout)
+                else:
+                    item = self.speech_queue.get_nowait()
+            except queue.Empty:
+                return False
+            
+            if item is None:
+                return True
+            
+            if length + len(item[0]) >= self.batch_char_limit:
+                self._carry = (item, self._generation)
+                return False
+            
+            texts.append(item[0])
+            events.append(item[1])
+            length += len(item[0]) + 1
+        
+        return False
+    
+    def _enqueue(self, text: str, blocking: bool):
+        """Queue text for the worker, waiting for it to be spoken if blocking"""
+        # pyttsx3 engines cannot run two loops at once, so blocking speech
+        # also goes through the worker and simply waits for its turn
+        done = threading.Event() if blocking else None
+        with self._pending_lock:
+            self._pending += 1
+        self.speech_queue.put((text, done))
+        
+        if done:
+            done.wait()
+    
+    def _release_pending(self):
+        """Count one queued utterance as finished"""
+        with self._pending_lock:
+            self._pending -= 1
     
     def speak(self, text: str, blocking: bool = False):
         """
@@ -124,37 +216,78 @@ class TextToSpeech:
         if not text or not text.strip():
             return
         
-        try:
-            if blocking:
-                # Speak immediately in blocking mode
-                self.is_speaking = True
-                self.engine.say(text)
-                self.engine.runAndWait()
-                self.is_speaking = False
+        self._enqueue(text, blocking)
+    
+    def speak_batch(self, texts: List[str], blocking: bool = False):
+        """
+        Speak several texts in order, joining short consecutive ones
+        
+        Args:
+            texts: Texts to speak
+            blocking: If True, wait for all speech to complete
+        """
+        if not self.engine:
+            self.logger.warning("TTS engine not initialized")
+            return
+        
+        merged = []
+        buffer = ''
+        for text in texts:
+            text = text.strip() if text else ''
+            if not text:
+                continue
+            if buffer and len(buffer) + len(text) >= self.batch_char_limit:
+                merged.append(buffer)
+                buffer = text
             else:
-                # Add to queue for async speaking
-                self.speech_queue.put(text)
-                
-        except Exception as e:
-            self.logger.error(f"Error speaking text: {e}")
-            self.is_speaking = False
+                buffer = f"{buffer} {text}" if buffer else text
+        if buffer:
+            merged.append(buffer)
+        
+        # Speech is spoken in queue order, so waiting on the last item
+        # covers the whole batch
+        for i, text in enumerate(merged):
+            self._enqueue(text, blocking and i == len(merged) - 1)
+    
+    async def speak_async(self, text: str):
+        """
+        Convert text to speech, awaiting completion without blocking the event loop
+        
+        Args:
+            text: Text to speak
+        """
+        await asyncio.to_thread(self.speak, text, True)
     
     def stop(self):
-        """Stop current speech"""
-        if self.engine and self.is_speaking:
-            try:
+        """Stop current speech and discard queued speech"""
+        if not self.engine:
+            return
+        
+        try:
+            self._generation += 1
+            
+            # Clear queue, keeping wait_until_done's count in step
+            while True:
+                try:
+                    item = self.speech_queue.get_nowait()
+                except queue.Empty:
+                    break
+                
+                # Release anyone blocked on discarded speech
+                if item and item[1]:
+                    item[1].set()
+                if item:
+                    self._release_pending()
+                self.speech_queue.task_done()
+            
+            # An idle engine needs no interrupt, and stopping one can stall
+            # the next utterance on some SAPI drivers
+            if self.is_speaking:
                 self.engine.stop()
                 self.is_speaking = False
                 
-                # Clear queue
-                while not self.speech_queue.empty():
-                    try:
-                        self.speech_queue.get_nowait()
-                    except queue.Empty:
-                        break
-                        
-            except Exception as e:
-                self.logger.error(f"Error stopping speech: {e}")
+        except Exception as e:
+            self.logger.error(f"Error stopping speech: {e}")
     
     def is_busy(self) -> bool:
         """
@@ -163,7 +296,7 @@ class TextToSpeech:
         Returns:
             bool: True if speaking, False otherwise
         """
-        return self.is_speaking or not self.speech_queue.empty()
+        return self.is_speaking or self._pending > 0
     
     def wait_until_done(self):
         """Wait until all queued speech is complete"""
@@ -199,9 +332,22 @@ class TextToSpeech:
         Returns:
             List of available voice objects
         """
-        if self.engine:
-            return self.engine.getProperty('voices')
-        return []
+        if not self.engine:
+            return []
+        
+        if self._voices_cache is None:
+            self._voices_cache = self.engine.getProperty('voices')
+        return self._voices_cache
+    
+    def refresh_voices(self) -> list:
+        """
+        Re-read the installed voices from the driver
+        
+        Returns:
+            List of available voice objects
+        """
+        self._voices_cache = None
+        return self.list_voices()
     
     def set_voice(self, voice_id: int):
         """
@@ -227,10 +373,13 @@ class TextToSpeech:
             self.speech_thread.join(timeout=2.0)
         
         if self.engine:
-            try:
-                self.engine.stop()
-            except:
-                pass
+            # The worker has drained via the sentinel; only interrupt speech
+            # that is still running
+            if self.is_speaking:
+                try:
+                    self.engine.stop()
+                except:
+                    pass
             self.engine = None
         
         self.logger.info("TTS engine shutdown")
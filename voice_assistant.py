@@ -28,6 +28,7 @@ def main():
     )
     
     logger = logging.getLogger(__name__)
+    assistant = None
     
     try:
         # Load configuration
@@ -77,12 +78,14 @@ def main():
         print(f"\nError: {e}")
     
     finally:
-        # Cleanup
-        try:
-            assistant.shutdown()
+        # Cleanup; a partly initialized assistant still releases the
+        # modules it did start
+        if assistant is not None:
+            try:
+                assistant.shutdown()
+            except Exception as e:
+                logger.error(f"Error during shutdown: {e}")
             print("\nGoodbye!")
-        except:
-            pass
 
 
 if __name__ == "__main__":
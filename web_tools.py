@@ -4,12 +4,83 @@ Provides internet access for information gathering
 """
 
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import concurrent.futures
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+import html
 import json
+import os
+import re
+import shutil
 import urllib.parse
 
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    # requests.Session is used instead (HTTP/1.1 keep-alive only)
+    HTTPX_AVAILABLE = False
+
+try:
+    import h2
+    HTTP2_AVAILABLE = HTTPX_AVAILABLE
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    # Only gzip/deflate responses are requested
+    BROTLI_AVAILABLE = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    # BeautifulSoup is used for parsing instead
+    SELECTOLAX_AVAILABLE = False
+
+try:
+    from lxml import etree, html as lxml_html
+    LXML_AVAILABLE = True
+except ImportError:
+    # BeautifulSoup falls back to the pure-Python html.parser
+    LXML_AVAILABLE = False
+
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    # Every call then goes to the network
+    DISKCACHE_AVAILABLE = False
+
+# Elements whose text is not page content
+_NON_CONTENT_TAGS = ["script", "style", "nav", "footer", "header"]
+_WHITESPACE_RE = re.compile(r'\s+')
+_TITLE_RE = re.compile(rb'<title[^>]*>(.*?)</title>', re.I | re.S)
+# Titles sit in <head>, so only the start of a page is downloaded
+_TITLE_SCAN_BYTES = 16384
+
+_BS4_PARSER = 'lxml' if LXML_AVAILABLE else 'html.parser'
+
+
+def _default_cache_dir() -> str:
+    """Get the per-user directory of the on-disk web cache"""
+    base = os.environ.get('LOCALAPPDATA') if os.name == 'nt' else os.environ.get('XDG_CACHE_HOME')
+    return os.path.join(base or os.path.expanduser(os.path.join('~', '.cache')), 'jarvis', 'web')
+
+
+def _has_result_class(css_class: Optional[str]) -> bool:
+    """Match a raw class attribute, which is not yet split while parsing"""
+    return css_class is not None and 'result' in css_class.split()
+
+
+# Only result blocks are built into the tree when parsing search pages
+_RESULT_STRAINER = SoupStrainer('div', attrs={'class': _has_result_class})
+
 
 class WebTools:
     """
@@ -25,15 +96,68 @@ class WebTools:
             config: Dictionary containing web configuration parameters
         """
         self.config = config
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': config.get('user_agent', 
-                'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-        })
         self.timeout = config.get('timeout', 10)
         self.max_results = config.get('max_results', 5)
+        self.search_ttl = config.get('search_ttl', 600)
+        self.page_ttl = config.get('page_ttl', 86400)
+        self.max_bytes = config.get('max_bytes', 512 * 1024)
         
         self.logger = logging.getLogger(__name__)
+        
+        # On-disk cache of search results and page text, shared across runs
+        self.cache = None
+        cache_dir = config.get('cache_dir', _default_cache_dir())
+        if DISKCACHE_AVAILABLE and cache_dir:
+            try:
+                self.cache = diskcache.Cache(os.path.expanduser(cache_dir))
+            except Exception as e:
+                self.logger.warning(f"Failed to open web cache, caching disabled: {e}")
+        
+        # Pooled connections (multiplexed over HTTP/2 when available) avoid
+        # a new TLS handshake per request to the same host
+        if HTTPX_AVAILABLE:
+            self.session = httpx.Client(
+                http2=HTTP2_AVAILABLE,
+                follow_redirects=True,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_keepalive_connections=16)
+            )
+        else:
+            self.session = requests.Session()
+        
+        # Bounded pool for blocking fetches of several pages at once
+        self.pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=config.get('web_workers', 4),
+            thread_name_prefix='web'
+        )
+        
+        self.session.headers.update({
+            'User-Agent': config.get('user_agent', 
+                'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'),
+            # Advertise br only when a decoder is installed
+            'Accept-Encoding': 'gzip, deflate, br' if BROTLI_AVAILABLE else 'gzip, deflate'
+        })
+    
+    def _cache_get(self, key: tuple):
+        """Look up a cached value, or None on a miss"""
+        if self.cache is None:
+            return None
+        
+        try:
+            return self.cache.get(key)
+        except Exception as e:
+            self.logger.debug(f"Web cache read failed: {e}")
+            return None
+    
+    def _cache_set(self, key: tuple, value, ttl: float):
+        """Store a value in the cache for ttl seconds"""
+        if self.cache is None:
+            return
+        
+        try:
+            self.cache.set(key, value, expire=ttl)
+        except Exception as e:
+            self.logger.debug(f"Web cache write failed: {e}")
     
     def search(self, query: str, max_results: Optional[int] = None) -> List[Dict[str, str]]:
         """
@@ -73,6 +197,11 @@ class WebTools:
         Returns:
             List of search results
         """
+        key = ('ddg', query, max_results)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        
         try:
             # Use DuckDuckGo HTML version for scraping
             url = "https://html.duckduckgo.com/html/"
@@ -81,28 +210,9 @@ class WebTools:
             response = self.session.post(url, data=data, timeout=self.timeout)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            results = []
-            
-            # Parse search results
-            for result_div in soup.find_all('div', class_='result')[:max_results]:
-                try:
-                    title_elem = result_div.find('a', class_='result__a')
-                    snippet_elem = result_div.find('a', class_='result__snippet')
-                    
-                    if title_elem:
-                        title = title_elem.get_text(strip=True)
-                        url = title_elem.get('href', '')
-                        snippet = snippet_elem.get_text(strip=True) if snippet_elem else ""
-                        
-                        results.append({
-                            'title': title,
-                            'url': url,
-                            'snippet': snippet
-                        })
-                except Exception as e:
-                    self.logger.debug(f"Error parsing result: {e}")
-                    continue
+            results = self._parse_duckduckgo(response.text, max_results)
+            if results:
+                self._cache_set(key, results, self.search_ttl)
             
             self.logger.info(f"Found {len(results)} search results for: {query}")
             return results
@@ -111,6 +221,102 @@ class WebTools:
             self.logger.error(f"DuckDuckGo search error: {e}")
             return []
     
+    def _parse_duckduckgo(self, html: str, max_results: int) -> List[Dict[str, str]]:
+        """
+        Parse results from a DuckDuckGo HTML results page
+        
+        Args:
+            html: Results page HTML
+            max_results: Maximum number of results
+            
+        Returns:
+            List of search results
+        """
+        results = []
+        
+        if SELECTOLAX_AVAILABLE:
+            # lexbor builds the tree in C, far faster than html.parser
+            for result_div in HTMLParser(html).css('div.result')[:max_results]:
+                title_elem = result_div.css_first('a.result__a')
+                if title_elem:
+                    snippet_elem = result_div.css_first('a.result__snippet')
+                    results.append({
+                        'title': title_elem.text(strip=True),
+                        'url': title_elem.attributes.get('href') or '',
+                        'snippet': snippet_elem.text(strip=True) if snippet_elem else ""
+                    })
+            return results
+        
+        soup = BeautifulSoup(html, _BS4_PARSER, parse_only=_RESULT_STRAINER)
+        
+        # Parse search results
+        for result_div in soup.find_all('div', class_='result', limit=max_results):
+            try:
+                find = result_div.find
+                title_elem = find('a', class_='result__a')
+                snippet_elem = find('a', class_='result__snippet')
+                
+                if title_elem:
+                    title = title_elem.get_text(strip=True)
+                    url = title_elem.get('href', '')
+                    snippet = snippet_elem.get_text(strip=True) if snippet_elem else ""
+                    
+                    results.append({
+                        'title': title,
+                        'url': url,
+                        'snippet': snippet
+                    })
+            except Exception as e:
+                self.logger.debug(f"Error parsing result: {e}")
+                continue
+        
+        return results
+    
+    def _get_head(self, url: str, max_bytes: int) -> Tuple[bytes, Optional[str]]:
+        """
+        Download at most max_bytes of a page body, closing the stream early
+        
+        Args:
+            url: URL of the webpage
+            max_bytes: Maximum number of decoded bytes to read
+            
+        Returns:
+            Start of the page body and the charset declared by the server
+        """
+        chunks = []
+        size = 0
+        
+        if HTTPX_AVAILABLE:
+            with self.session.stream('GET', url) as response:
+                response.raise_for_status()
+                for chunk in response.iter_bytes():
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= max_bytes:
+                        break
+                charset = response.charset_encoding
+        else:
+            with self.session.get(url, timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=16384):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= max_bytes:
+                        break
+                # requests reports ISO-8859-1 for any text/* without a charset
+                declared = 'charset' in response.headers.get('content-type', '').lower()
+                charset = response.encoding if declared else None
+        
+        return b''.join(chunks)[:max_bytes], charset
+    
+    @staticmethod
+    def _decode(body: bytes, charset: Optional[str]) -> str:
+        """Decode a possibly truncated page body, defaulting to UTF-8"""
+        try:
+            return body.decode(charset or 'utf-8', errors='ignore')
+        except LookupError:
+            return body.decode('utf-8', errors='ignore')
+    
     def fetch_webpage(self, url: str) -> Optional[str]:
         """
         Fetch and extract text content from a webpage
@@ -121,23 +327,16 @@ class WebTools:
         Returns:
             str: Extracted text content, or None if failed
         """
+        cached = self._cache_get(('page', url))
+        if cached is not None:
+            return cached
+        
         try:
-            response = self.session.get(url, timeout=self.timeout)
-            response.raise_for_status()
+            # Huge pages are cut off instead of being held and parsed whole
+            body, charset = self._get_head(url, self.max_bytes)
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style", "nav", "footer", "header"]):
-                script.decompose()
-            
-            # Get text content
-            text = soup.get_text(separator=' ', strip=True)
-            
-            # Clean up whitespace
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            text = ' '.join(chunk for chunk in chunks if chunk)
+            text = self._extract_text(self._decode(body, charset))
+            self._cache_set(('page', url), text, self.page_ttl)
             
             self.logger.info(f"Fetched {len(text)} characters from: {url}")
             return text
@@ -146,19 +345,50 @@ class WebTools:
             self.logger.error(f"Error fetching webpage: {e}")
             return None
     
-    def fetch_webpage_summary(self, url: str, max_length: int = 500) -> Optional[str]:
+    @staticmethod
+    def _extract_text(html: str) -> str:
         """
-        Fetch and return a summary of webpage content
+        Extract readable text from HTML
         
         Args:
-            url: URL of the webpage
-            max_length: Maximum length of summary
+            html: Page HTML
             
         Returns:
-            str: Summary of webpage content
+            str: Text content with whitespace collapsed
         """
-        content = self.fetch_webpage(url)
+        if SELECTOLAX_AVAILABLE:
+            tree = HTMLParser(html)
+            tree.strip_tags(_NON_CONTENT_TAGS)
+            text = tree.root.text(separator=' ', strip=True) if tree.root else ""
+            return _WHITESPACE_RE.sub(' ', text).strip()
+        
+        if LXML_AVAILABLE:
+            try:
+                root = lxml_html.fromstring(html)
+            except (ValueError, etree.ParserError):
+                # Empty documents and XML encoding declarations
+                root = None
+            
+            if root is not None:
+                # One C-level pass removes every non-content element
+                etree.strip_elements(root, *_NON_CONTENT_TAGS, with_tail=False)
+                return _WHITESPACE_RE.sub(' ', ' '.join(root.itertext())).strip()
+        
+        soup = BeautifulSoup(html, _BS4_PARSER)
+        
+        # Remove script and style elements
+        for script in soup(_NON_CONTENT_TAGS):
+            script.decompose()
         
+        # Get text content
+        text = soup.get_text(separator=' ', strip=True)
+        
+        # Clean up whitespace
+        return _WHITESPACE_RE.sub(' ', text).strip()
+    
+    @staticmethod
+    def _summarize(content: Optional[str], max_length: int) -> Optional[str]:
+        """Truncate page content to a summary"""
         if content:
             if len(content) > max_length:
                 return content[:max_length] + "..."
@@ -166,6 +396,100 @@ class WebTools:
         
         return None
     
+    def fetch_webpage_summary(self, url: str, max_length: int = 500) -> Optional[str]:
+        """
+        Fetch and return a summary of webpage content
+        
+        Args:
+            url: URL of the webpage
+            max_length: Maximum length of summary
+            
+        Returns:
+            str: Summary of webpage content
+        """
+        return self._summarize(self.fetch_webpage(url), max_length)
+    
+    def fetch_many(self, urls: List[str]) -> List[Optional[str]]:
+        """
+        Fetch several webpages in parallel on the worker pool
+        
+        Args:
+            urls: URLs of the webpages
+            
+        Returns:
+            List of page texts in the order of urls, None for failed pages
+        """
+        return list(self.pool.map(self.fetch_webpage, urls))
+    
+    async def fetch_webpage_summaries_async(self, urls: List[str],
+                                            max_length: int = 500) -> List[Optional[str]]:
+        """
+        Fetch summaries of several webpages concurrently (requires httpx)
+        
+        Args:
+            urls: URLs of the webpages
+            max_length: Maximum length of each summary
+            
+        Returns:
+            List of summaries in the order of urls, None for failed pages
+        """
+        semaphore = asyncio.Semaphore(self.config.get('max_concurrent_fetches', 4))
+        
+        async def fetch(client, url):
+            """Fetch one page, bounded by the semaphore"""
+            text = self._cache_get(('page', url))
+            if text is not None:
+                return self._summarize(text, max_length)
+            
+            async with semaphore:
+                try:
+                    body = bytearray()
+                    async with client.stream('GET', url) as response:
+                        response.raise_for_status()
+                        async for chunk in response.aiter_bytes():
+                            body += chunk
+                            if len(body) >= self.max_bytes:
+                                break
+                        charset = response.charset_encoding
+                    
+                    text = self._extract_text(self._decode(bytes(body[:self.max_bytes]), charset))
+                    self._cache_set(('page', url), text, self.page_ttl)
+                    return self._summarize(text, max_length)
+                except Exception as e:
+                    self.logger.error(f"Error fetching webpage: {e}")
+                    return None
+        
+        # A client is bound to the event loop it was created in
+        async with httpx.AsyncClient(http2=HTTP2_AVAILABLE, follow_redirects=True,
+                                     timeout=self.timeout,
+                                     headers=dict(self.session.headers)) as client:
+            return await asyncio.gather(*(fetch(client, url) for url in urls))
+    
+    def search_and_fetch_summaries(self, query: str, max_length: int = 500) -> List[Dict[str, str]]:
+        """
+        Search the web and fetch a summary of each result page
+        
+        Args:
+            query: Search query
+            max_length: Maximum length of each summary
+            
+        Returns:
+            List of search results with title, url, snippet, and summary
+        """
+        results = self.search(query)
+        urls = [result['url'] for result in results]
+        
+        # Page fetches overlap on the network instead of adding up
+        if HTTPX_AVAILABLE:
+            summaries = asyncio.run(self.fetch_webpage_summaries_async(urls, max_length))
+        else:
+            summaries = [self._summarize(text, max_length) for text in self.fetch_many(urls)]
+        
+        for result, summary in zip(results, summaries):
+            result['summary'] = summary or ""
+        
+        return results
+    
     def search_and_summarize(self, query: str) -> str:
         """
         Search for query and return formatted results with summaries
@@ -202,14 +526,22 @@ class WebTools:
         Returns:
             str: Page title, or None if failed
         """
+        cached = self._cache_get(('title', url))
+        if cached is not None:
+            return cached
+        
         try:
-            response = self.session.get(url, timeout=self.timeout)
-            response.raise_for_status()
+            head, charset = self._get_head(url, _TITLE_SCAN_BYTES)
+            match = _TITLE_RE.search(head)
+            if not match:
+                return None
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            title = soup.find('title')
+            title = html.unescape(self._decode(match.group(1), charset))
+            title = _WHITESPACE_RE.sub(' ', title).strip()
             
-            return title.get_text(strip=True) if title else None
+            if title:
+                self._cache_set(('title', url), title, self.page_ttl)
+            return title
             
         except Exception as e:
             self.logger.error(f"Error getting page title: {e}")
@@ -227,12 +559,24 @@ class WebTools:
             bool: True if successful
         """
         try:
-            response = self.session.get(url, timeout=self.timeout, stream=True)
-            response.raise_for_status()
-            
-            with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            if HTTPX_AVAILABLE:
+                with self.session.stream('GET', url) as response:
+                    response.raise_for_status()
+                    
+                    # Write chunks as the transport delivers them, without
+                    # re-slicing them into small pieces
+                    with open(filepath, 'wb') as f:
+                        for chunk in response.iter_bytes():
+                            f.write(chunk)
+            else:
+                response = self.session.get(url, timeout=self.timeout, stream=True)
+                response.raise_for_status()
+                
+                # Copy from the raw stream in 1 MB blocks, decompressing
+                # any Content-Encoding on the way
+                response.raw.decode_content = True
+                with open(filepath, 'wb') as f:
+                    shutil.copyfileobj(response.raw, f, length=1 << 20)
             
             self.logger.info(f"Downloaded file to: {filepath}")
             return True
@@ -257,9 +601,83 @@ class WebTools:
         except:
             return False
     
+    async def check_urls_accessible_async(self, urls: List[str],
+                                          limit: Optional[int] = None) -> List[str]:
+        """
+        Check several URLs concurrently with HEAD requests (requires httpx)
+        
+        Args:
+            urls: URLs to check
+            limit: Stop once this many accessible URLs are found
+            
+        Returns:
+            Accessible URLs in the order of urls
+        """
+        semaphore = asyncio.Semaphore(self.config.get('max_concurrent_checks', 16))
+        
+        async def check(client, url):
+            """HEAD one URL, bounded by the semaphore"""
+            async with semaphore:
+                try:
+                    response = await client.head(url)
+                    return response.status_code < 400
+                except Exception:
+                    return False
+        
+        async with httpx.AsyncClient(http2=HTTP2_AVAILABLE, follow_redirects=True,
+                                     timeout=self.timeout,
+                                     headers=dict(self.session.headers)) as client:
+            tasks = [asyncio.ensure_future(check(client, url)) for url in urls]
+            pending = set(tasks)
+            found = 0
+            
+            while pending and (limit is None or found < limit):
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                found += sum(task.result() for task in done)
+            
+            # Drop outstanding requests before the client closes
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        
+        accessible = [url for url, task in zip(urls, tasks)
+                      if not task.cancelled() and task.result()]
+        return accessible[:limit] if limit is not None else accessible
+    
+    def check_urls_accessible(self, urls: List[str], limit: Optional[int] = None) -> List[str]:
+        """
+        Filter a list of URLs down to the accessible ones
+        
+        Args:
+            urls: URLs to check
+            limit: Stop once this many accessible URLs are found
+            
+        Returns:
+            Accessible URLs in the order of urls
+        """
+        if HTTPX_AVAILABLE:
+            return asyncio.run(self.check_urls_accessible_async(urls, limit))
+        
+        futures = [self.pool.submit(self.check_url_accessible, url) for url in urls]
+        found = 0
+        for future in concurrent.futures.as_completed(futures):
+            found += future.result()
+            if limit is not None and found >= limit:
+                # Checks still queued on the pool are dropped
+                for pending in futures:
+                    pending.cancel()
+                break
+        
+        accessible = [url for url, future in zip(urls, futures)
+                      if future.done() and not future.cancelled() and future.result()]
+        return accessible[:limit] if limit is not None else accessible
+    
     def shutdown(self):
         """Close the session and cleanup"""
+        self.pool.shutdown(wait=False, cancel_futures=True)
         self.session.close()
+        if self.cache is not None:
+            self.cache.close()
         self.logger.info("Web tools session closed")
 
 